@@ -0,0 +1,184 @@
+"""
+Request coalescing primitives used by SpotifyAPI.
+
+SingleFlight lets concurrent callers asking for the same key share one
+in-flight call. MicroBatcher collects single-id lookups issued within a short
+window and resolves them with one bulk call.
+"""
+
+import copy
+import logging
+import threading
+import time
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# A window closes early after this fraction of it passes with no new id.
+IDLE_FRACTION = 0.1
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.future: Future = Future()
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, _Flight] = {}
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+            else:
+                flight.waiters += 1
+                self.shared += 1
+
+        if not leader:
+            # Callers are free to mutate what they get back, so each waiter
+            # gets its own copy of the leader's result.
+            return copy.deepcopy(flight.future.result())
+
+        try:
+            result = fn()
+        except BaseException as err:
+            self._finish(key)
+            flight.future.set_exception(err)
+            raise
+
+        waiters = self._finish(key)
+        flight.future.set_result(result)
+        return copy.deepcopy(result) if waiters else result
+
+    def _finish(self, key: Hashable) -> int:
+        with self._lock:
+            return self._in_flight.pop(key).waiters
+
+
+class MicroBatcher:
+    """
+    Single-id lookups issued within `window` seconds are fetched together with
+    `fetch_many`, at most `max_size` ids per call. `fetch_many` must return
+    items in request order, with None for ids that were not found.
+
+    A caller whose id is still pending leads the next window: it waits up to
+    `window` seconds (or until `max_size` ids are pending), takes a batch and
+    hands leadership to the next waiting caller before fetching, so several
+    batches can be in flight at once. A caller returns as soon as its own id
+    is resolved, however long the backlog behind it.
+    """
+
+    def __init__(
+        self,
+        fetch_many: Callable[[list[str]], list[Any]],
+        max_size: int,
+        window: float,
+        name: str = "items",
+    ) -> None:
+        self.fetch_many = fetch_many
+        self.max_size = max_size
+        self.window = window
+        self.name = name
+        self._cond = threading.Condition()
+        self._pending: dict[str, Future] = {}
+        self._leader_active = False
+        self.submitted = 0
+        self.batches = 0
+
+    def submit(self, item_id: str) -> Any:
+        with self._cond:
+            self.submitted += 1
+            future = self._pending.get(item_id)
+            if future is None:
+                future = self._pending[item_id] = Future()
+            if len(self._pending) >= self.max_size:
+                self._cond.notify_all()
+
+        while not future.done():
+            batch = self._take_batch(item_id, future)
+            if batch is not None:
+                self._flush(*batch)
+        return copy.deepcopy(future.result())
+
+    def _take_batch(
+        self, item_id: str, future: Future
+    ) -> tuple[list[str], list[Future]] | None:
+        """
+        Lead one window if nobody else is and our id is still pending;
+        otherwise wait for a hand-off or a finished batch and return None.
+        """
+        with self._cond:
+            if future.done():
+                return None
+            if self._leader_active or self._pending.get(item_id) is not future:
+                self._cond.wait()
+                return None
+
+            self._leader_active = True
+            deadline = time.monotonic() + self.window
+            while len(self._pending) < self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Callers arrive in bursts; once a burst is over, waiting out
+                # the rest of the window only adds latency.
+                submitted = self.submitted
+                idle = self.window * IDLE_FRACTION
+                if not self._cond.wait(min(remaining, idle)) and (
+                    self.submitted == submitted
+                ):
+                    break
+            ids = list(self._pending)[: self.max_size]
+            futures = [self._pending.pop(i) for i in ids]
+            self.batches += 1
+            self._leader_active = False
+            self._cond.notify_all()
+            return ids, futures
+
+    def _flush(self, ids: list[str], futures: list[Future]) -> None:
+        logger.debug("Fetching %s %s in one batch.", len(ids), self.name)
+        try:
+            self._resolve(ids, futures)
+        finally:
+            with self._cond:
+                self._cond.notify_all()
+
+    def _resolve(self, ids: list[str], futures: list[Future]) -> None:
+        try:
+            items = self.fetch_many(ids)
+            if len(items) != len(ids):
+                raise RuntimeError(
+                    f"Expected {len(ids)} {self.name} in batch, got {len(items)}."
+                )
+        except Exception as err:
+            if len(ids) == 1:
+                futures[0].set_exception(err)
+                return
+            # One bad id (e.g. a malformed one) fails the whole request, so
+            # split the batch to keep the error with the ids that cause it.
+            logger.warning(
+                "Batch of %s %s failed (%s), retrying in halves.",
+                len(ids),
+                self.name,
+                err,
+            )
+            half = len(ids) // 2
+            self._resolve(ids[:half], futures[:half])
+            self._resolve(ids[half:], futures[half:])
+            return
+
+        for item_id, future, item in zip(ids, futures, items, strict=True):
+            if item is None:
+                future.set_exception(
+                    RuntimeError(f"Failed to make request: 404 {item_id} not found")
+                )
+            else:
+                future.set_result(item)
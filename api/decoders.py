@@ -0,0 +1,73 @@
+"""
+Typed msgspec decoders for the album responses used by the pipeline.
+
+Only the fields TransformSpotify.clean_album reads are declared, so msgspec
+skips everything else (available_markets, href, uri, copyrights, ...) while
+parsing instead of materialising it as Python objects. Structs are converted
+back to plain dicts, missing fields are omitted so clean_album's defaults
+still apply.
+"""
+
+from typing import Any
+
+import msgspec
+
+DecodeError = msgspec.DecodeError
+
+
+class ExternalUrls(msgspec.Struct, omit_defaults=True):
+    spotify: str | None = None
+
+
+class Image(msgspec.Struct, omit_defaults=True):
+    url: str | None = None
+    width: int | None = None
+
+
+class Artist(msgspec.Struct, omit_defaults=True):
+    id: str | None = None
+    name: str | None = None
+    external_urls: ExternalUrls | None = None
+
+
+class Album(msgspec.Struct, omit_defaults=True):
+    id: str | None = None
+    name: str | None = None
+    album_type: str | None = None
+    artists: list[Artist] = []
+    images: list[Image] = []
+    total_tracks: int | str | None = None
+    release_date: str | None = None
+    release_date_precision: str | None = None
+    external_urls: ExternalUrls | None = None
+
+
+class AlbumPage(msgspec.Struct, omit_defaults=True):
+    items: list[Album] = []
+    total: int | None = None
+    next: str | None = None
+
+
+class NewReleasesResponse(msgspec.Struct, omit_defaults=True):
+    albums: AlbumPage | None = None
+
+
+class SeveralAlbumsResponse(msgspec.Struct, omit_defaults=True):
+    albums: list[Album | None] = []
+
+
+RESPONSE_TYPES: dict[str, type] = {
+    "album": Album,
+    "album_page": AlbumPage,
+    "new_releases": NewReleasesResponse,
+    "several_albums": SeveralAlbumsResponse,
+}
+
+_decoders: dict[str, msgspec.json.Decoder] = {
+    name: msgspec.json.Decoder(response_type)
+    for name, response_type in RESPONSE_TYPES.items()
+}
+
+
+def decode(content: bytes, response_type: str) -> dict[str, Any]:
+    return msgspec.to_builtins(_decoders[response_type].decode(content))
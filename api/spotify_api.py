@@ -1,11 +1,16 @@
 import base64
+import functools
 import logging
 import os
+import threading
+import time
 from typing import Any
 
 import requests
 from dotenv import load_dotenv
 
+from api.coalescing import MicroBatcher, SingleFlight
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -14,8 +19,12 @@ logger = logging.getLogger(__name__)
 class SpotifyAPI:
     TOKEN_URL: str = "https://accounts.spotify.com/api/token"  # noqa: S105
     BASE_URL: str = "https://api.spotify.com/v1"  # noqa: S105
+    # Maximum ids accepted by the get_several_* endpoints.
+    BATCH_LIMITS: dict[str, int] = {"albums": 20, "artists": 50, "tracks": 50}
 
-    def __init__(self) -> None:
+    def __init__(
+        self, fast_decode: bool | None = None, batch_window: float | None = None
+    ) -> None:
         self.client_id: str | None = os.getenv("CLIENT_ID")
         self.client_secret: str | None = os.getenv("CLIENT_SECRET")
 
@@ -30,6 +39,34 @@ class SpotifyAPI:
 
         self.access_token: str | None = None
         self.expires_in: int | None = None
+        self.token_expires_at: float | None = None
+        # One keep-alive session per client, so long-running processes reuse
+        # TCP/TLS connections instead of reconnecting on every call.
+        self.session = requests.Session()
+
+        if fast_decode is None:
+            fast_decode = os.getenv("SPOTIFY_FAST_DECODE", "").lower() in {"1", "true"}
+        self.decoders = None
+        if fast_decode:
+            try:
+                from api import decoders
+            except ImportError as err:
+                raise ImportError(
+                    "Fast decoding requires the 'msgspec' package "
+                    "(uv sync --extra fast-json)."
+                ) from err
+            self.decoders = decoders
+
+        # Seconds single get_album/get_artist/get_track calls wait to be merged
+        # into one get_several_* request. 0 disables micro-batching.
+        if batch_window is None:
+            batch_window = float(os.getenv("SPOTIFY_BATCH_WINDOW_MS", "0")) / 1000
+        self.batch_window = batch_window
+        self._batchers: dict[tuple[str, str | None], MicroBatcher] = {}
+        self._batchers_lock = threading.Lock()
+        self._single_flight = SingleFlight()
+        self.http_requests = 0
+        self._stats_lock = threading.Lock()
 
         logger.info("SpotifyAPI initialized successfully.")
 
@@ -41,7 +78,7 @@ class SpotifyAPI:
             "Content-Type": "application/x-www-form-urlencoded",
         }
 
-        req = requests.post(
+        req = self.session.post(
             url=self.TOKEN_URL, data=token_data, headers=token_headers, timeout=10
         )
 
@@ -52,6 +89,7 @@ class SpotifyAPI:
         data = req.json()
         self.access_token = data["access_token"]
         self.expires_in = data["expires_in"]
+        self.token_expires_at = time.monotonic() + self.expires_in
 
         logger.info(
             "Access token retrieved successfully (expires in %s seconds).",
@@ -59,6 +97,14 @@ class SpotifyAPI:
         )
         return self.access_token
 
+    def refresh_token_if_expiring(self, margin: float = 60.0) -> None:
+        if (
+            self.token_expires_at is not None
+            and time.monotonic() >= self.token_expires_at - margin
+        ):
+            logger.info("Access token about to expire, refreshing.")
+            self.get_token()
+
     def get_headers(self) -> dict[str, str]:
         if not self.access_token:
             logger.error("No access token. Call get_token() first.")
@@ -68,20 +114,87 @@ class SpotifyAPI:
             "Content-Type": "application/json",
         }
 
-    def make_request(self, endpoint: str, params: dict | None = None) -> dict[str, Any]:
+    def make_request(
+        self,
+        endpoint: str,
+        params: dict | None = None,
+        response_type: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Identical requests issued concurrently share one HTTP call.
+
+        response_type names a typed decoder in api.decoders. It is only used
+        when fast decoding is enabled, otherwise the full JSON body is returned.
+        """
+        key = (endpoint, tuple(sorted((params or {}).items())), response_type)
+        return self._single_flight.do(
+            key, lambda: self._send_request(endpoint, params, response_type)
+        )
+
+    def _send_request(
+        self, endpoint: str, params: dict | None, response_type: str | None
+    ) -> dict[str, Any]:
         url: str = self.BASE_URL + endpoint
+        self.refresh_token_if_expiring()
         headers: dict[str, str] = self.get_headers()
 
         logger.debug("Making request to %s with params=%s", url, params)
-        req = requests.get(url=url, headers=headers, params=params, timeout=10)
+        with self._stats_lock:
+            self.http_requests += 1
+        req = self.session.get(url=url, headers=headers, params=params, timeout=10)
 
         if req.status_code != 200:
             logger.error("Request failed [%s]: %s", req.status_code, req.text)
             raise RuntimeError(f"Failed to make request: {req.status_code} {req.text}")
 
         logger.info("Request to %s succeeded.", endpoint)
+        if response_type is not None and self.decoders is not None:
+            try:
+                return self.decoders.decode(req.content, response_type)
+            except self.decoders.DecodeError as err:
+                logger.warning(
+                    "Typed decode of %s failed (%s), using full JSON.", endpoint, err
+                )
         return req.json()
 
+    def _batched(self, kind: str, item_id: str, market: str | None = None) -> Any:
+        with self._batchers_lock:
+            batcher = self._batchers.get((kind, market))
+            if batcher is None:
+                batcher = self._batchers[(kind, market)] = MicroBatcher(
+                    functools.partial(self._fetch_several, kind, market),
+                    max_size=self.BATCH_LIMITS[kind],
+                    window=self.batch_window,
+                    name=kind,
+                )
+        return batcher.submit(item_id)
+
+    def _fetch_several(
+        self, kind: str, market: str | None, ids: list[str]
+    ) -> list[Any]:
+        if kind == "albums":
+            return self.get_several_albums(ids, market=market)["albums"]
+        if kind == "tracks":
+            return self.get_several_tracks(ids, market=market)["tracks"]
+        return self.get_several_artists(ids)["artists"]
+
+    def request_stats(self) -> dict[str, Any]:
+        """
+        HTTP requests actually sent versus the calls callers made, with the
+        difference attributed to single-flight sharing and micro-batching.
+        """
+        batched_calls = sum(b.submitted for b in self._batchers.values())
+        batch_requests = sum(b.batches for b in self._batchers.values())
+        saved_by_batching = batched_calls - batch_requests
+        logical = self.http_requests + self._single_flight.shared + saved_by_batching
+        return {
+            "logical_requests": logical,
+            "http_requests": self.http_requests,
+            "coalesced": self._single_flight.shared,
+            "saved_by_batching": saved_by_batching,
+            "reduction": 1 - self.http_requests / logical if logical else 0.0,
+        }
+
     def search(
         self,
         query: str,
@@ -109,6 +222,8 @@ class SpotifyAPI:
         Get Spotify catalog information for a single track.
         https://developer.spotify.com/documentation/web-api/reference/get-track
         """
+        if self.batch_window > 0:
+            return self._batched("tracks", track_id, market)
         params: dict[str, Any] = {}
         if market:
             params["market"] = market
@@ -132,6 +247,8 @@ class SpotifyAPI:
         Get Spotify catalog information for a single artist.
         https://developer.spotify.com/documentation/web-api/reference/get-an-artist
         """
+        if self.batch_window > 0:
+            return self._batched("artists", artist_id)
         return self.make_request(f"/artists/{artist_id}")
 
     def get_several_artists(self, artist_ids: list[str]) -> dict[str, Any]:
@@ -163,7 +280,9 @@ class SpotifyAPI:
             params["include_groups"] = ",".join(include_groups)
         if market:
             params["market"] = market
-        return self.make_request(f"/artists/{artist_id}/albums", params=params)
+        return self.make_request(
+            f"/artists/{artist_id}/albums", params=params, response_type="album_page"
+        )
 
     def get_artist_top_tracks(self, artist_id: str, market: str) -> dict[str, Any]:
         """
@@ -179,10 +298,14 @@ class SpotifyAPI:
         Get Spotify catalog information for a single album.
         https://developer.spotify.com/documentation/web-api/reference/get-an-album
         """
+        if self.batch_window > 0:
+            return self._batched("albums", album_id, market)
         params: dict[str, Any] = {}
         if market:
             params["market"] = market
-        return self.make_request(f"/albums/{album_id}", params=params)
+        return self.make_request(
+            f"/albums/{album_id}", params=params, response_type="album"
+        )
 
     def get_several_albums(
         self, album_ids: list[str], market: str | None = None
@@ -196,7 +319,9 @@ class SpotifyAPI:
         params: dict[str, Any] = {"ids": ids_str}
         if market:
             params["market"] = market
-        return self.make_request("/albums", params=params)
+        return self.make_request(
+            "/albums", params=params, response_type="several_albums"
+        )
 
     def get_album_tracks(
         self,
@@ -225,4 +350,6 @@ class SpotifyAPI:
         https://developer.spotify.com/documentation/web-api/reference/get-new-releases
         """
         params: dict[str, Any] = {"limit": limit, "offset": offset}
-        return self.make_request("/browse/new-releases", params=params)
+        return self.make_request(
+            "/browse/new-releases", params=params, response_type="new_releases"
+        )
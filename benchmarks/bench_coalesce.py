@@ -0,0 +1,97 @@
+"""
+HTTP request count of a concurrent artist crawl, with and without coalescing.
+
+Usage:
+    uv run python -m benchmarks.bench_coalesce --albums 500 --threads 16
+
+Spotify is replaced by an in-process fake with fixed latency, so the numbers
+only reflect how many HTTP calls SpotifyAPI issues. Featured artists are drawn
+from a skewed pool, as on real new-release pages where a few artists appear on
+many albums.
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from api.spotify_api import SpotifyAPI
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, body: dict) -> None:
+        self.body = body
+        self.content = b""
+
+    def json(self) -> dict:
+        return self.body
+
+
+def fake_get(latency: float):
+    def get(url: str, params: dict | None = None, **_kwargs) -> FakeResponse:
+        time.sleep(latency)
+        path = urlparse(url).path
+        if path.endswith("/artists"):
+            ids = params["ids"].split(",")
+            return FakeResponse({"artists": [{"id": i} for i in ids]})
+        return FakeResponse({"id": path.rsplit("/", 1)[-1]})
+
+    return get
+
+
+def crawl(client: SpotifyAPI, albums: list[list[str]], threads: int) -> float:
+    def visit(artist_ids: list[str]) -> None:
+        for artist_id in artist_ids:
+            client.get_artist(artist_id)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(visit, albums))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--albums", type=int, default=500)
+    parser.add_argument("--artists", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=30)
+    parser.add_argument("--window-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("CLIENT_ID", "bench")
+    os.environ.setdefault("CLIENT_SECRET", "bench")
+    rng = random.Random(0)  # noqa: S311
+    pool = [f"artist{i}" for i in range(args.artists)]
+    weights = [1 / (rank + 1) for rank in range(args.artists)]
+    albums = [
+        rng.choices(pool, weights, k=rng.randint(1, 4)) for _ in range(args.albums)
+    ]
+
+    print(
+        f"{'mode':<22} {'calls':>6} {'http':>6} {'coalesced':>10} "
+        f"{'batched':>8} {'saved':>7} {'seconds':>8}"
+    )
+    for mode, window in (
+        ("single-flight", 0.0),
+        ("single-flight + batch", args.window_ms / 1000),
+    ):
+        client = SpotifyAPI(batch_window=window)
+        client.access_token = "bench"  # noqa: S105
+        client.session.get = fake_get(args.latency_ms / 1000)
+        seconds = crawl(client, albums, args.threads)
+        stats = client.request_stats()
+        print(
+            f"{mode:<22} {stats['logical_requests']:>6} {stats['http_requests']:>6} "
+            f"{stats['coalesced']:>10} {stats['saved_by_batching']:>8} "
+            f"{stats['reduction']:>7.1%} {seconds:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Parse time and peak memory of album responses, per 1,000 albums.
+
+Usage:
+    uv run --extra fast-json python -m benchmarks.bench_decode --albums 1000
+
+Compares the stdlib json path used by requests' Response.json() with orjson
+(when installed) and the typed msgspec decoders from api.decoders, which only
+materialise the fields TransformSpotify.clean_album reads.
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+MARKETS = [f"{chr(65 + i // 26)}{chr(65 + i % 26)}" for i in range(180)]
+
+
+def make_payload(count: int) -> bytes:
+    items = []
+    for i in range(count):
+        album_id = f"{i:022d}"
+        items.append(
+            {
+                "album_type": "album",
+                "total_tracks": 12,
+                "available_markets": MARKETS,
+                "external_urls": {
+                    "spotify": f"https://open.spotify.com/album/{album_id}"
+                },
+                "href": f"https://api.spotify.com/v1/albums/{album_id}",
+                "id": album_id,
+                "images": [
+                    {
+                        "url": f"https://i.scdn.co/image/{album_id}{w}",
+                        "height": w,
+                        "width": w,
+                    }
+                    for w in (640, 300, 64)
+                ],
+                "name": f"Album {i}",
+                "release_date": "2025-01-01",
+                "release_date_precision": "day",
+                "type": "album",
+                "uri": f"spotify:album:{album_id}",
+                "artists": [
+                    {
+                        "external_urls": {
+                            "spotify": f"https://open.spotify.com/artist/{i}"
+                        },
+                        "href": f"https://api.spotify.com/v1/artists/{i}",
+                        "id": f"artist{i:016d}",
+                        "name": f"Artist {i}",
+                        "type": "artist",
+                        "uri": f"spotify:artist:{i}",
+                    }
+                ],
+            }
+        )
+    return json.dumps({"albums": {"items": items, "total": count}}).encode()
+
+
+def measure(decode: Callable[[bytes], Any], payload: bytes, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        decode(payload)
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    result = decode(payload)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return min(timings), peak, retained
+
+
+def decoders() -> dict[str, Callable[[bytes], Any]]:
+    candidates: dict[str, Callable[[bytes], Any]] = {"json": json.loads}
+    try:
+        import orjson
+
+        candidates["orjson"] = orjson.loads
+    except ImportError:
+        pass
+    try:
+        from api import decoders as typed
+
+        candidates["msgspec typed"] = lambda content: typed.decode(
+            content, "new_releases"
+        )
+    except ImportError:
+        pass
+    return candidates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--albums", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    payload = make_payload(args.albums)
+    per = 1_000 / args.albums
+    print(f"payload: {len(payload) / 1024:.0f} KiB for {args.albums} albums")
+    print(f"{'decoder':<14} {'ms/1k':>8} {'peak MiB/1k':>12} {'kept MiB/1k':>12}")
+    for name, decode in decoders().items():
+        seconds, peak, retained = measure(decode, payload, args.repeat)
+        print(
+            f"{name:<14} {seconds * 1000 * per:>8.2f} "
+            f"{peak / 2**20 * per:>12.2f} {retained / 2**20 * per:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Import time of the CLI entry point, checked against a budget.
+
+Usage:
+    uv run python -m benchmarks.bench_import --budget-ms 50
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters, reports
+the best cumulative import time of the module and exits non-zero when it is
+over budget or when it pulled in one of the heavy dependencies that should
+only be imported by the subcommands that need them.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+
+HEAVY_MODULES: tuple[str, ...] = (
+    "requests",
+    "psycopg2",
+    "dotenv",
+    "duckdb",
+    "pandas",
+    "numpy",
+    "msgspec",
+)
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_profile(module: str) -> dict[str, int]:
+    """
+    Cumulative import time in microseconds of every top-level module line.
+    """
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="pipeline.cli")
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    profiles = [import_profile(args.module) for _ in range(args.repeat)]
+    best_ms = min(profile[args.module] for profile in profiles) / 1000
+    heavy = sorted(
+        name
+        for name in profiles[0]
+        if name.split(".")[0] in HEAVY_MODULES and "." not in name
+    )
+
+    print(f"{args.module}: {best_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if heavy:
+        print(f"heavy modules imported eagerly: {', '.join(heavy)}")
+    if best_ms > args.budget_ms or heavy:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Postgres load throughput as a function of worker count.
+
+Usage:
+    BENCH_DATABASE_URL=postgresql://localhost/spotify_bench \\
+        uv run python -m benchmarks.bench_load --albums 20000 --workers 1 2 4 8
+
+The target database must already have db/schema.sql applied. Every N, 1
+included, goes through ShardedPostgresBackend so only the number of
+connections changes between rows, not the batching. Every run writes fresh
+album ids, so runs do not overwrite each other; artists are drawn from a
+shared pool to reproduce the row-lock contention of real backfills.
+
+--concurrent K runs K such loads at once, each with its own albums and
+connections but the same artists, like overlapping `run` and `serve` jobs.
+A deadlock between them aborts the benchmark with DeadlockDetected.
+"""
+
+import argparse
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+from pipeline.storage import DUCKDB_SCHEME, ShardedPostgresBackend
+
+
+def make_albums(count: int, artist_pool: int, seed: int = 0) -> list[dict[str, Any]]:
+    rng = random.Random(seed)  # noqa: S311
+    run_id = uuid.uuid4().hex[:8]
+    now = "2025-09-25T10:00:00+00:00"
+    albums = []
+    for i in range(count):
+        artist_ids = rng.sample(range(artist_pool), k=rng.randint(1, 3))
+        albums.append(
+            {
+                "album_id": f"bench-{run_id}-{i}",
+                "album_name": f"Album {i}",
+                "album_type": rng.choice(["album", "single", "compilation"]),
+                "release_date": "2024-01-01",
+                "release_year": 2024,
+                "release_date_precision": "day",
+                "total_tracks": rng.randint(1, 20),
+                "image_url": None,
+                "spotify_url": None,
+                "extracted_at": now,
+                "extraction_type": "benchmark",
+                "processed_at": now,
+                "data_type": "album",
+                "artists": [
+                    {
+                        "artist_id": f"bench-artist-{a}",
+                        "artist_name": f"Artist {a}",
+                        "spotify_url": None,
+                    }
+                    for a in artist_ids
+                ],
+            }
+        )
+    return albums
+
+
+def load_albums(database_url: str, workers: int, albums: list[dict[str, Any]]) -> None:
+    backend = ShardedPostgresBackend(database_url, workers=workers)
+    try:
+        backend.upsert_albums(albums)
+    finally:
+        backend.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--albums", type=int, default=10_000)
+    parser.add_argument("--artists", type=int, default=2_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--concurrent", type=int, default=1)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+    if not args.database_url or args.database_url.startswith(DUCKDB_SCHEME):
+        parser.error(
+            "needs a Postgres URL (--database-url or BENCH_DATABASE_URL); "
+            "DuckDB has a single writer, so workers would not change anything."
+        )
+
+    print(f"{'workers':>8} {'loads':>6} {'albums':>8} {'seconds':>9} {'albums/s':>10}")
+    for workers in args.workers:
+        batches = [
+            make_albums(args.albums, args.artists, seed=i)
+            for i in range(args.concurrent)
+        ]
+        load = partial(load_albums, args.database_url, workers)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrent) as pool:
+            list(pool.map(load, batches))
+        elapsed = time.perf_counter() - started
+        total = sum(map(len, batches))
+        print(
+            f"{workers:>8} {args.concurrent:>6} {total:>8} {elapsed:>9.2f} "
+            f"{total / elapsed:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Bytes per ID and lookup throughput of SeenIds versus a Python set.
+
+Usage:
+    uv run python -m benchmarks.bench_seen --ids 10000000
+    uv run python -m benchmarks.bench_seen --ids 10000000 --memory-budget 32
+
+IDs are random 128-bit values in Spotify's base62 form, inserted in batches
+as a crawl would. The set baseline is measured on at most --set-ids IDs and
+scaled per ID, since ten million strings take over a gigabyte.
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from pipeline.seen import ALPHABET, ID_LENGTH, SeenIds
+
+# 7 * 62**21 < 2**128, so a leading digit below 7 keeps IDs in range.
+LEADING = np.frombuffer(ALPHABET[:7], dtype=np.uint8)
+DIGITS = np.frombuffer(ALPHABET, dtype=np.uint8)
+
+
+def make_ids(count: int, rng: np.random.Generator) -> np.ndarray:
+    chars = DIGITS[rng.integers(0, len(DIGITS), size=(count, ID_LENGTH))]
+    chars[:, 0] = LEADING[rng.integers(0, len(LEADING), size=count)]
+    return np.ascontiguousarray(chars).view(f"S{ID_LENGTH}").ravel()
+
+
+def bench_seen(args: argparse.Namespace) -> np.ndarray:
+    rng = np.random.default_rng(args.seed)
+    seen = SeenIds(memory_budget=args.memory_budget * 2**20)
+    batches = -(-args.ids // args.batch)
+    # half of the lookups are hits, sampled evenly across the batches
+    per_batch = -(-args.lookups // (2 * batches))
+    tracemalloc.start()
+    inserted = 0.0
+    sample = []
+    for start in range(0, args.ids, args.batch):
+        batch = make_ids(min(args.batch, args.ids - start), rng)
+        sample.append(batch[:per_batch].copy())
+        started = time.perf_counter()
+        seen.add_many(batch)
+        inserted += time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    hits = np.concatenate(sample)[: args.lookups // 2]
+    misses = make_ids(args.lookups - len(hits), rng)
+    queries = np.concatenate([hits, misses])
+    rng.shuffle(queries)
+    started = time.perf_counter()
+    found = seen.contains_many(queries)
+    batched = time.perf_counter() - started
+    assert found.sum() >= len(hits)
+
+    single = [q.decode() for q in queries[:10_000]]
+    started = time.perf_counter()
+    for spotify_id in single:
+        _ = spotify_id in seen
+    one_by_one = time.perf_counter() - started
+
+    stored = seen.resident_bytes + seen.spilled_bytes
+    print(
+        f"SeenIds: {len(seen):,} IDs, {len(seen._blocks)} blocks, "
+        f"{seen.resident_bytes / 2**20:.0f} MiB resident, "
+        f"{seen.spilled_bytes / 2**20:.0f} MiB spilled"
+    )
+    print(f"  bytes/ID stored      {stored / len(seen):>10.1f}")
+    print(f"  peak MiB (inserting) {peak / 2**20:>10.0f}")
+    print(f"  inserts/s            {args.ids / inserted:>10,.0f}")
+    print(f"  lookups/s (batched)  {len(queries) / batched:>10,.0f}")
+    print(f"  lookups/s (single)   {len(single) / one_by_one:>10,.0f}")
+    seen.close()
+    return queries
+
+
+def bench_set(args: argparse.Namespace, queries: np.ndarray) -> None:
+    rng = np.random.default_rng(args.seed)
+    count = min(args.ids, args.set_ids)
+    strings = [i.decode() for i in make_ids(count, rng)]
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    seen = set()
+    for spotify_id in strings:
+        seen.add(spotify_id)
+    inserted = time.perf_counter() - started
+    set_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # in a real crawl the set keeps the ID strings alive as well
+    string_bytes = sum(sys.getsizeof(s) for s in strings)
+
+    lookups = [q.decode() for q in queries]
+    started = time.perf_counter()
+    for spotify_id in lookups:
+        _ = spotify_id in seen
+    looked_up = time.perf_counter() - started
+
+    print(f"set[str]: {count:,} IDs")
+    print(f"  bytes/ID stored      {(set_bytes + string_bytes) / count:>10.1f}")
+    print(f"  inserts/s            {count / inserted:>10,.0f}")
+    print(f"  lookups/s (single)   {len(lookups) / looked_up:>10,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ids", type=int, default=10_000_000)
+    parser.add_argument("--batch", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    parser.add_argument("--memory-budget", type=int, default=256, help="MiB")
+    parser.add_argument("--set-ids", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    queries = bench_seen(args)
+    bench_set(args, queries)
+
+
+if __name__ == "__main__":
+    main()
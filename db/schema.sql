@@ -41,3 +41,48 @@ CREATE TABLE IF NOT EXISTS pipeline_metrics (
     total_artists INT,                -- ile artystów
     total_album_artist INT            -- ile powiązań album-artist
 );
+
+-- czasy etapów (dodane później, stąd ALTER dla istniejących baz)
+ALTER TABLE pipeline_metrics ADD COLUMN IF NOT EXISTS extract_seconds DOUBLE PRECISION;
+ALTER TABLE pipeline_metrics ADD COLUMN IF NOT EXISTS transform_seconds DOUBLE PRECISION;
+ALTER TABLE pipeline_metrics ADD COLUMN IF NOT EXISTS load_seconds DOUBLE PRECISION;
+ALTER TABLE pipeline_metrics ADD COLUMN IF NOT EXISTS duration_seconds DOUBLE PRECISION;
+
+-- dzienne podsumowanie pipeline_metrics, aktualizowane po każdym runie
+CREATE TABLE IF NOT EXISTS pipeline_metrics_daily (
+    day DATE NOT NULL,
+    operation TEXT NOT NULL,
+    runs INT NOT NULL,
+    failures INT NOT NULL,
+    rows_added BIGINT NOT NULL,             -- tylko udane runy
+    duration_seconds DOUBLE PRECISION NOT NULL,
+    success_duration_seconds DOUBLE PRECISION NOT NULL,  -- tylko udane runy
+    stage_histograms TEXT NOT NULL,         -- JSON: etap -> {kubełek: liczba}
+    failure_streak INT NOT NULL,            -- porażki z rzędu na koniec dnia
+    longest_failure_streak INT NOT NULL,
+    last_status TEXT,
+    last_run_at TIMESTAMP,
+    total_albums INT,                       -- stan po ostatnim runie dnia
+    total_artists INT,
+    total_album_artist INT,
+    PRIMARY KEY (day, operation)
+);
+
+-- hash treści ostatnio załadowanego albumu/artysty, do wykrywania zmian
+CREATE TABLE IF NOT EXISTS content_hash (
+    entity TEXT NOT NULL,                   -- "album" albo "artist"
+    entity_key TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    PRIMARY KEY (entity, entity_key)
+);
+
+-- append-only log zmian, czytany przez konsumentów od danego offsetu
+CREATE TABLE IF NOT EXISTS change_log (
+    log_offset BIGSERIAL PRIMARY KEY,
+    recorded_at TIMESTAMP DEFAULT NOW(),
+    entity TEXT NOT NULL,
+    entity_key TEXT NOT NULL,
+    op TEXT NOT NULL,                       -- "insert", "update" albo "delete"
+    before_hash TEXT,
+    after_hash TEXT
+);
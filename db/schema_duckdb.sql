@@ -0,0 +1,91 @@
+-- Embedded DuckDB variant of schema.sql, used by DuckDBBackend for local runs.
+-- Foreign keys are left out: DuckDB rewrites ON CONFLICT DO UPDATE as
+-- delete + insert, which would trip the constraint on already linked rows.
+CREATE SCHEMA IF NOT EXISTS public;
+
+CREATE TABLE IF NOT EXISTS public.artist (
+    artist_id TEXT PRIMARY KEY,
+    artist_name TEXT NOT NULL,
+    spotify_url TEXT,
+    extracted_at TIMESTAMPTZ,
+    processed_at TIMESTAMPTZ
+);
+
+CREATE TABLE IF NOT EXISTS public.album (
+    album_id TEXT PRIMARY KEY,
+    album_name TEXT NOT NULL,
+    album_type TEXT,
+    release_date DATE,
+    release_year INTEGER,
+    release_date_precision TEXT,
+    total_tracks INTEGER,
+    image_url TEXT,
+    spotify_url TEXT,
+    extracted_at TIMESTAMPTZ,
+    extraction_type TEXT,
+    processed_at TIMESTAMPTZ,
+    data_type TEXT
+);
+
+-- (album <-> artist)
+CREATE TABLE IF NOT EXISTS public.album_artist (
+    album_id TEXT NOT NULL,
+    artist_id TEXT NOT NULL,
+    PRIMARY KEY (album_id, artist_id)
+);
+
+CREATE SEQUENCE IF NOT EXISTS public.pipeline_metrics_id_seq;
+
+CREATE TABLE IF NOT EXISTS public.pipeline_metrics (
+    id INTEGER PRIMARY KEY DEFAULT nextval('public.pipeline_metrics_id_seq'),
+    run_at TIMESTAMP DEFAULT current_timestamp,
+    operation TEXT NOT NULL,
+    status TEXT NOT NULL,
+    rows_added INT,
+    total_albums INT,
+    total_artists INT,
+    total_album_artist INT
+);
+
+ALTER TABLE public.pipeline_metrics ADD COLUMN IF NOT EXISTS extract_seconds DOUBLE;
+ALTER TABLE public.pipeline_metrics ADD COLUMN IF NOT EXISTS transform_seconds DOUBLE;
+ALTER TABLE public.pipeline_metrics ADD COLUMN IF NOT EXISTS load_seconds DOUBLE;
+ALTER TABLE public.pipeline_metrics ADD COLUMN IF NOT EXISTS duration_seconds DOUBLE;
+
+CREATE TABLE IF NOT EXISTS public.pipeline_metrics_daily (
+    day DATE NOT NULL,
+    operation TEXT NOT NULL,
+    runs INT NOT NULL,
+    failures INT NOT NULL,
+    rows_added BIGINT NOT NULL,
+    duration_seconds DOUBLE NOT NULL,
+    success_duration_seconds DOUBLE NOT NULL,
+    stage_histograms TEXT NOT NULL,
+    failure_streak INT NOT NULL,
+    longest_failure_streak INT NOT NULL,
+    last_status TEXT,
+    last_run_at TIMESTAMP,
+    total_albums INT,
+    total_artists INT,
+    total_album_artist INT,
+    PRIMARY KEY (day, operation)
+);
+
+CREATE TABLE IF NOT EXISTS public.content_hash (
+    entity TEXT NOT NULL,
+    entity_key TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    PRIMARY KEY (entity, entity_key)
+);
+
+CREATE SEQUENCE IF NOT EXISTS public.change_log_offset_seq;
+
+CREATE TABLE IF NOT EXISTS public.change_log (
+    log_offset BIGINT PRIMARY KEY DEFAULT nextval('public.change_log_offset_seq'),
+    recorded_at TIMESTAMP DEFAULT current_timestamp,
+    entity TEXT NOT NULL,
+    entity_key TEXT NOT NULL,
+    op TEXT NOT NULL,
+    before_hash TEXT,
+    after_hash TEXT
+);
@@ -0,0 +1,262 @@
+"""
+Change data capture for the load stage.
+
+Before a batch is upserted, every album and artist payload is hashed and
+compared with the hash stored by the previous load. Albums whose payload (and
+artists) did not change are dropped from the batch, and the inserted/updated
+keys are appended to a change log that downstream jobs read by offset instead
+of rescanning the tables.
+
+Hashes are saved only after the change log has been written, so a crash in
+between re-emits the same changes on the next run: delivery is at least once.
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import struct
+from abc import ABC, abstractmethod
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from pipeline.storage import (
+    ALBUM_COLUMNS,
+    ARTIST_COLUMNS,
+    TRACKED_ENTITIES,
+    StorageBackend,
+)
+
+logger = logging.getLogger(__name__)
+
+# Load metadata that changes on every run without the album itself changing.
+VOLATILE_FIELDS = frozenset({"extracted_at", "processed_at", "extraction_type"})
+ALBUM_HASH_FIELDS = tuple(c for c in ALBUM_COLUMNS if c not in VOLATILE_FIELDS)
+ARTIST_HASH_FIELDS = tuple(c for c in ARTIST_COLUMNS if c not in VOLATILE_FIELDS)
+# NdjsonChangeLog index entry: the byte position just past one line
+INDEX_ENTRY = struct.Struct("<Q")
+
+
+def content_hash(values: list[Any]) -> str:
+    payload = json.dumps(values, default=str, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def album_hash(clean_album: dict[str, Any]) -> str:
+    # The artist list is part of the album: a changed credit is an update.
+    artist_ids = sorted(a["artist_id"] for a in clean_album.get("artists", []))
+    return content_hash([clean_album.get(c) for c in ALBUM_HASH_FIELDS] + artist_ids)
+
+
+def artist_hash(artist: dict[str, Any]) -> str:
+    return content_hash([artist.get(c) for c in ARTIST_HASH_FIELDS])
+
+
+def diff_hashes(
+    entity: str,
+    hashes: dict[str, str],
+    stored: dict[str, str | None],
+    recorded_at: datetime,
+) -> list[dict[str, Any]]:
+    changes = []
+    for key, after in hashes.items():
+        if key not in stored:
+            op, before = "insert", None
+        elif stored[key] == after:
+            continue
+        else:
+            op, before = "update", stored[key]
+        changes.append(
+            {
+                "recorded_at": recorded_at,
+                "entity": entity,
+                "entity_key": key,
+                "op": op,
+                "before_hash": before,
+                "after_hash": after,
+            }
+        )
+    return changes
+
+
+def detect_changes(
+    backend: StorageBackend, clean_albums: list[dict[str, Any]]
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Returns the albums that still need loading (the album or one of its
+    artists changed) and the changes they carry.
+    """
+    hashes: dict[str, dict[str, str]] = {entity: {} for entity in TRACKED_ENTITIES}
+    for clean_album in clean_albums:
+        hashes["album"][clean_album["album_id"]] = album_hash(clean_album)
+        for artist in clean_album.get("artists", []):
+            hashes["artist"][artist["artist_id"]] = artist_hash(artist)
+
+    recorded_at = datetime.now(UTC).replace(tzinfo=None)
+    changes = []
+    for entity, entity_hashes in hashes.items():
+        stored = backend.stored_hashes(entity, list(entity_hashes))
+        changes += diff_hashes(entity, entity_hashes, stored, recorded_at)
+
+    changed = {(c["entity"], c["entity_key"]) for c in changes}
+    pending = [
+        clean_album
+        for clean_album in clean_albums
+        if ("album", clean_album["album_id"]) in changed
+        or any(
+            ("artist", artist["artist_id"]) in changed
+            for artist in clean_album.get("artists", [])
+        )
+    ]
+    return pending, changes
+
+
+class ChangeLog(ABC):
+    """
+    Append-only sequence of changes. Offsets start at 1 and only grow, so a
+    consumer stores the last offset it processed and asks for what follows.
+    """
+
+    @abstractmethod
+    def append(self, changes: list[dict[str, Any]]) -> None: ...
+
+    @abstractmethod
+    def read(self, since: int = 0, limit: int | None = None) -> list[dict[str, Any]]:
+        """
+        Changes with an offset greater than `since`, oldest first.
+        """
+
+
+class TableChangeLog(ChangeLog):
+    """
+    change_log table in the warehouse, next to the data it describes.
+    """
+
+    def __init__(self, backend: StorageBackend) -> None:
+        self.backend = backend
+
+    def append(self, changes: list[dict[str, Any]]) -> None:
+        self.backend.append_changes(changes)
+
+    def read(self, since: int = 0, limit: int | None = None) -> list[dict[str, Any]]:
+        return self.backend.read_changes(since=since, limit=limit)
+
+
+class NdjsonChangeLog(ChangeLog):
+    """
+    Local newline-delimited JSON file; a change's offset is its line number.
+
+    A sidecar `<path>.idx` holds the byte position just past each line as a
+    little-endian uint64, so the last offset is the index size over eight
+    and read() seeks straight to `since`. append() fsyncs a batch before
+    indexing it, and readers only see indexed lines. The next append
+    truncates a last line torn by a crash and indexes complete lines the
+    crash left out of the index.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+
+    @staticmethod
+    def _line_end(index: BinaryIO, offset: int) -> int:
+        if offset == 0:
+            return 0
+        index.seek((offset - 1) * INDEX_ENTRY.size)
+        return INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))[0]
+
+    def _recover(self) -> int:
+        """
+        Makes the index match the complete lines of the log; returns the
+        last offset.
+        """
+        size = self.path.stat().st_size if self.path.exists() else 0
+        with self.index_path.open("a+b") as index:
+            entries = index.seek(0, os.SEEK_END) // INDEX_ENTRY.size
+            while entries and self._line_end(index, entries) > size:
+                entries -= 1
+            index.truncate(entries * INDEX_ENTRY.size)
+            indexed = self._line_end(index, entries)
+            if indexed == size:
+                return entries
+
+            with self.path.open("r+b") as data:
+                data.seek(indexed)
+                tail = data.read()
+                complete = tail.rfind(b"\n") + 1
+                if complete < len(tail):
+                    logger.warning("Truncating a torn last line of %s.", self.path)
+                    data.truncate(indexed + complete)
+                    os.fsync(data.fileno())
+            lines = tail[:complete].split(b"\n")[:-1]
+            ends = list(
+                itertools.accumulate((len(line) + 1 for line in lines), initial=indexed)
+            )
+            self._write_index(index, ends[1:])
+            return entries + len(lines)
+
+    @staticmethod
+    def _write_index(index: BinaryIO, ends: list[int]) -> None:
+        index.write(b"".join(INDEX_ENTRY.pack(end) for end in ends))
+        index.flush()
+        os.fsync(index.fileno())
+
+    def append(self, changes: list[dict[str, Any]]) -> None:
+        first = self._recover() + 1
+        lines = [
+            json.dumps(
+                {"log_offset": offset, **change}, default=datetime.isoformat
+            ).encode()
+            + b"\n"
+            for offset, change in enumerate(changes, start=first)
+        ]
+        with self.path.open("ab") as data:
+            start = data.tell()
+            data.write(b"".join(lines))
+            data.flush()
+            os.fsync(data.fileno())
+        with self.index_path.open("ab") as index:
+            ends = itertools.accumulate(map(len, lines), initial=start)
+            self._write_index(index, list(ends)[1:])
+
+    def read(self, since: int = 0, limit: int | None = None) -> list[dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        if not self.index_path.exists():
+            # A log written before the index existed.
+            self._recover()
+        with self.index_path.open("rb") as index:
+            entries = index.seek(0, os.SEEK_END) // INDEX_ENTRY.size
+            stop = entries if limit is None else min(entries, since + limit)
+            if since >= stop:
+                return []
+            start, end = self._line_end(index, since), self._line_end(index, stop)
+        with self.path.open("rb") as data:
+            data.seek(start)
+            return [json.loads(line) for line in data.read(end - start).splitlines()]
+
+
+def create_change_log(spec: str | None, backend: StorageBackend) -> ChangeLog | None:
+    """
+    "off" (or empty) disables change tracking, "table" writes to the
+    change_log table, anything else is the path of an NDJSON file.
+    """
+    if not spec or spec == "off":
+        return None
+    if spec == "table":
+        return TableChangeLog(backend)
+    return NdjsonChangeLog(spec)
+
+
+def record_changes(
+    backend: StorageBackend, change_log: ChangeLog, changes: list[dict[str, Any]]
+) -> None:
+    change_log.append(changes)
+    backend.save_hashes(changes)
+    logger.info(
+        "Recorded %s changes (%s inserts).",
+        len(changes),
+        sum(c["op"] == "insert" for c in changes),
+    )
@@ -0,0 +1,323 @@
+"""
+Command line entry point.
+
+Only the standard library is imported at module level. Subcommands import
+the pipeline stages (and with them requests, psycopg2, dotenv, ...) when they
+run, so `--help` and light commands such as `status` start fast.
+"""
+
+import argparse
+import logging
+import os
+import sys
+from datetime import UTC, datetime
+
+logger = logging.getLogger(__name__)
+
+BENCHMARKS: tuple[str, ...] = ("load", "decode", "coalesce", "import", "seen")
+# option -> (environment variable, fallback) resolved after .env is loaded
+ENV_DEFAULTS: dict[str, tuple[str, str | None]] = {
+    "database_url": ("DATABASE_URL", None),
+    "workers": ("LOAD_WORKERS", "1"),
+    "change_log": ("CHANGE_LOG", "off"),
+    "new_releases_interval": ("NEW_RELEASES_INTERVAL", "1h"),
+}
+
+
+def configure_logging(log_dir: str | None = "logs", level: int = logging.INFO) -> None:
+    handlers: list[logging.Handler] = [logging.StreamHandler()]
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+        log_filename = os.path.join(
+            log_dir, f"etl_{datetime.now(UTC).strftime('%Y-%m-%d')}.log"
+        )
+        handlers.append(logging.FileHandler(log_filename, encoding="utf-8"))
+    logging.basicConfig(
+        level=level,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        handlers=handlers,
+    )
+
+
+def load_env(args: argparse.Namespace) -> None:
+    """
+    Load .env and fill options left unset on the command line from it.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    for option, (variable, fallback) in ENV_DEFAULTS.items():
+        if getattr(args, option, fallback) is None:
+            setattr(args, option, os.getenv(variable, fallback))
+    if isinstance(getattr(args, "workers", None), str):
+        args.workers = int(args.workers)
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    from pipeline.pipeline import Pipeline
+
+    logger.info("Starting ETL pipeline...")
+    pipeline = Pipeline(
+        database_url=args.database_url,
+        load_workers=args.workers,
+        change_log=args.change_log,
+    )
+    try:
+        pipeline.run(save_raw=args.save_raw)
+    finally:
+        pipeline.close()
+    logger.info("ETL pipeline finished successfully.")
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    from pipeline.pipeline import Pipeline
+    from pipeline.scheduler import Job, Scheduler, parse_interval
+
+    logger.info("Starting ETL service...")
+    # One warm Pipeline (token, HTTP session, DB pool) shared by every run.
+    pipeline = Pipeline(
+        database_url=args.database_url,
+        load_workers=args.workers,
+        change_log=args.change_log,
+    )
+    scheduler = Scheduler(
+        [
+            Job(
+                name="new_releases",
+                interval=parse_interval(args.new_releases_interval),
+                func=pipeline.run,
+            ),
+        ]
+    )
+    scheduler.install_signal_handlers()
+    unfinished: list[str] = []
+    try:
+        unfinished = scheduler.run_forever()
+    finally:
+        if unfinished:
+            # Closing the pool and session under a running job would make it
+            # fail halfway; the process exit ends it instead.
+            logger.warning(
+                "Forced shutdown: %s still running, connections left open.",
+                ", ".join(unfinished),
+            )
+        else:
+            pipeline.close()
+
+
+def cmd_replay(args: argparse.Namespace) -> None:
+    import json
+
+    from pipeline.load import LoadSpotify
+    from pipeline.transform import TransformSpotify
+
+    with open(args.path, encoding="utf-8") as f:
+        raw = json.load(f)
+    # Accept either a dump written by `run --save-raw` or a raw API response.
+    raw_albums = raw["albums"]["items"] if isinstance(raw, dict) else raw
+    for raw_album in raw_albums:
+        raw_album.setdefault("extraction_type", "replay")
+
+    logger.info("Replaying %s albums from %s...", len(raw_albums), args.path)
+    clean_albums = TransformSpotify().transform_new_releases(raw_albums=raw_albums)
+    loader = LoadSpotify(
+        database_url=args.database_url,
+        workers=args.workers,
+        change_log=args.change_log,
+    )
+    try:
+        loader.load_new_releases(clean_albums=clean_albums)
+    finally:
+        loader.backend.close()
+
+
+def cmd_bench(args: argparse.Namespace) -> None:
+    import runpy
+
+    sys.argv = [f"bench_{args.name}", *args.bench_args]
+    runpy.run_module(f"benchmarks.bench_{args.name}", run_name="__main__")
+
+
+def _seconds(value: float | None) -> str:
+    return "-" if value is None else f"{value:.2f}s"
+
+
+def print_summary(report: dict) -> None:
+    print(
+        f"{report['operation']} {report['since']}..{report['until']}: "
+        f"{report['runs']} runs, {report['failures']} failed, "
+        f"failure streak {report['failure_streak']} "
+        f"(longest {report['longest_failure_streak']})"
+    )
+    print(f"{'day':<10} {'runs':>5} {'failed':>6} {'rows':>7} {'rows/s':>8}")
+    for day in report["daily"]:
+        rate = day["rows_per_second"]
+        print(
+            f"{day['day']:%Y-%m-%d} {day['runs']:>5} {day['failures']:>6} "
+            f"{day['rows_added']:>7} {'-' if rate is None else f'{rate:.1f}':>8}"
+        )
+    print(f"{'stage':<10} {'p50':>8} {'p95':>8} {'prev p95':>9} {'change':>7}")
+    for stage, timing in report["stages"].items():
+        change = timing["p95_change"]
+        print(
+            f"{stage:<10} {_seconds(timing['p50']):>8} {_seconds(timing['p95']):>8} "
+            f"{_seconds(timing['previous_p95']):>9} "
+            f"{'-' if change is None else f'{change:+.0%}':>7}"
+        )
+    for entity, growth in report["growth"].items():
+        if growth["change"] is not None:
+            print(
+                f"{entity}: {growth['total']} total, {growth['change']:+} "
+                f"({growth['per_day']:+.1f}/day)"
+            )
+    print()
+
+
+def cmd_status(args: argparse.Namespace) -> None:
+    from pipeline.history import rebuild_rollups, summary
+    from pipeline.storage import create_backend
+
+    backend = create_backend(args.database_url)
+    try:
+        if args.rebuild:
+            rebuild_rollups(backend)
+        report = summary(backend, operation=args.operation, days=args.days)
+        runs = backend.recent_pipeline_runs(limit=args.limit)
+    finally:
+        backend.close()
+
+    if not runs:
+        print("No pipeline runs recorded.")
+        return
+    print_summary(report)
+    print(f"{'run_at':<20} {'operation':<20} {'status':<8} {'rows':>6} {'albums':>8}")
+    for run in runs:
+        print(
+            f"{run['run_at']:%Y-%m-%d %H:%M:%S} {run['operation']:<20} "
+            f"{run['status']:<8} {run['rows_added'] or 0:>6} "
+            f"{run['total_albums'] or 0:>8}"
+        )
+
+
+def cmd_changes(args: argparse.Namespace) -> None:
+    import json
+
+    from pipeline.changes import create_change_log
+    from pipeline.storage import create_backend
+
+    backend = create_backend(args.database_url)
+    try:
+        change_log = create_change_log(args.change_log, backend)
+        if change_log is None:
+            print("Change log is off; set CHANGE_LOG or pass --change-log.")
+            return
+        for change in change_log.read(since=args.since, limit=args.limit):
+            print(json.dumps(change, default=datetime.isoformat))
+    finally:
+        backend.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py", description="Spotify ETL pipeline."
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    def add_database_options(sub: argparse.ArgumentParser) -> None:
+        sub.add_argument(
+            "--database-url",
+            help="Postgres DSN or duckdb:// URL (default: $DATABASE_URL).",
+        )
+        sub.add_argument(
+            "--workers",
+            type=int,
+            help="Parallel load connections (default: $LOAD_WORKERS or 1).",
+        )
+        add_change_log_option(sub)
+
+    def add_change_log_option(sub: argparse.ArgumentParser) -> None:
+        sub.add_argument(
+            "--change-log",
+            help='"table", an NDJSON file path or "off" (default: $CHANGE_LOG or off).',
+        )
+
+    run = subparsers.add_parser("run", help="Run the pipeline once (default).")
+    add_database_options(run)
+    run.add_argument("--save-raw", help="Dump extracted albums to this JSON file.")
+    run.set_defaults(func=cmd_run, needs_env=True, needs_logging=True)
+
+    serve = subparsers.add_parser("serve", help="Stay resident and run on a schedule.")
+    add_database_options(serve)
+    serve.add_argument(
+        "--new-releases-interval",
+        help="e.g. 15m, 1h, @daily (default: $NEW_RELEASES_INTERVAL or 1h).",
+    )
+    serve.set_defaults(func=cmd_serve, needs_env=True, needs_logging=True)
+
+    replay = subparsers.add_parser(
+        "replay", help="Transform and load a saved extraction without the API."
+    )
+    replay.add_argument("path", help="JSON file written by `run --save-raw`.")
+    add_database_options(replay)
+    replay.set_defaults(func=cmd_replay, needs_env=True, needs_logging=True)
+
+    bench = subparsers.add_parser("bench", help="Run one of the benchmarks.")
+    bench.add_argument("name", choices=BENCHMARKS)
+    bench.add_argument("bench_args", nargs=argparse.REMAINDER)
+    bench.set_defaults(func=cmd_bench, needs_env=False, needs_logging=False)
+
+    status = subparsers.add_parser(
+        "status", help="Summarise run history and show recent runs."
+    )
+    status.add_argument(
+        "--database-url",
+        help="Postgres DSN or duckdb:// URL (default: $DATABASE_URL).",
+    )
+    status.add_argument("--limit", type=int, default=10)
+    status.add_argument(
+        "--days", type=int, default=7, help="Summary window in days (default: 7)."
+    )
+    status.add_argument("--operation", default="load_new_releases")
+    status.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Recompute the daily rollups from pipeline_metrics first.",
+    )
+    status.set_defaults(func=cmd_status, needs_env=True, needs_logging=False)
+
+    changes = subparsers.add_parser(
+        "changes", help="Print change log entries after an offset as NDJSON."
+    )
+    changes.add_argument(
+        "--database-url",
+        help="Postgres DSN or duckdb:// URL (default: $DATABASE_URL).",
+    )
+    add_change_log_option(changes)
+    changes.add_argument(
+        "--since", type=int, default=0, help="Last offset already processed."
+    )
+    changes.add_argument("--limit", type=int)
+    changes.set_defaults(func=cmd_changes, needs_env=True, needs_logging=False)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        # Plain `main.py` keeps its historical behaviour: one pipeline run.
+        args = parser.parse_args(["run"])
+
+    if args.needs_env:
+        load_env(args)
+        if not args.database_url:
+            parser.error(
+                f"{args.command}: no database configured; set DATABASE_URL "
+                "or pass --database-url (a Postgres DSN or duckdb://path)."
+            )
+    if args.needs_logging:
+        configure_logging()
+    else:
+        configure_logging(log_dir=None, level=logging.WARNING)
+    args.func(args)
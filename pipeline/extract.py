@@ -1,15 +1,25 @@
 import logging
 from datetime import UTC, datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from api.spotify_api import SpotifyAPI
 
+if TYPE_CHECKING:
+    # pipeline.seen imports numpy, which a plain run never needs.
+    from pipeline.seen import SeenIds
+
 logger = logging.getLogger(__name__)
 
 
 class ExtractSpotify:
-    def __init__(self) -> None:
+    def __init__(self, seen_ids: "SeenIds | None" = None) -> None:
+        """
+        Args:
+            seen_ids: Album IDs extracted before, e.g. by earlier pages of a
+                crawl. Albums already in it are skipped and new ones added.
+        """
         self.client = SpotifyAPI()
+        self.seen_ids = seen_ids
         self.client.get_token()
         logger.info("ExtractSpotify initialized.")
 
@@ -28,9 +38,19 @@ class ExtractSpotify:
             raise Exception("Failed to extract new releases.") from err
 
         albums = response.get("albums", {}).get("items", [])
+        if self.seen_ids is not None:
+            albums = self.skip_seen(albums)
         logger.info("Extracted %s albums.", len(albums))
         for album in albums:
             album["extracted_at"] = datetime.now(UTC).isoformat()
             album["extraction_type"] = "new_releases"
 
         return albums
+
+    def skip_seen(self, albums: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        with_id = [i for i, album in enumerate(albums) if album.get("id")]
+        new = self.seen_ids.add_many([albums[i]["id"] for i in with_id])
+        seen = {i for i, is_new in zip(with_id, new, strict=True) if not is_new}
+        if seen:
+            logger.info("Skipping %s already extracted albums.", len(seen))
+        return [album for i, album in enumerate(albums) if i not in seen]
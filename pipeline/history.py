@@ -0,0 +1,258 @@
+"""
+Run history built on top of pipeline_metrics.
+
+Each logged run is folded into pipeline_metrics_daily, one row per day and
+operation, so `main.py status` reads a few dozen rollup rows instead of
+scanning every run. Stage durations are kept as sparse histograms with
+logarithmic buckets (each 10% wider than the previous one): they merge by
+adding counts and give p50/p95 within one bucket of the exact value.
+"""
+
+import json
+import logging
+import math
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+from pipeline.storage import STAGES, StorageBackend
+
+logger = logging.getLogger(__name__)
+
+HISTOGRAM_BASE = 0.01  # seconds; everything faster lands in bucket 0
+HISTOGRAM_RATIO = 1.1
+HISTOGRAM_STAGES: tuple[str, ...] = (*STAGES, "total")
+ENTITIES: tuple[str, ...] = ("albums", "artists", "album_artist")
+
+
+def bucket_of(seconds: float) -> int:
+    if seconds <= HISTOGRAM_BASE:
+        return 0
+    return math.ceil(math.log(seconds / HISTOGRAM_BASE, HISTOGRAM_RATIO))
+
+
+def bucket_upper_bound(bucket: int) -> float:
+    return HISTOGRAM_BASE * HISTOGRAM_RATIO**bucket
+
+
+def merge_histograms(histograms: list[dict[str, int]]) -> dict[str, int]:
+    merged: dict[str, int] = {}
+    for histogram in histograms:
+        for bucket, count in histogram.items():
+            merged[bucket] = merged.get(bucket, 0) + count
+    return merged
+
+
+def percentile(histogram: dict[str, int], q: float) -> float | None:
+    """
+    Upper bound of the bucket holding the q-th quantile (0 < q <= 1).
+    """
+    total = sum(histogram.values())
+    if not total:
+        return None
+    seen = 0
+    for bucket in sorted(histogram, key=int):
+        seen += histogram[bucket]
+        if seen >= q * total:
+            return bucket_upper_bound(int(bucket))
+    return None
+
+
+def empty_rollup(day: date, operation: str, failure_streak: int = 0) -> dict[str, Any]:
+    return {
+        "day": day,
+        "operation": operation,
+        "runs": 0,
+        "failures": 0,
+        "rows_added": 0,
+        "duration_seconds": 0.0,
+        "success_duration_seconds": 0.0,
+        "stage_histograms": {},
+        "failure_streak": failure_streak,
+        "longest_failure_streak": failure_streak,
+        "last_status": None,
+        "last_run_at": None,
+        "total_albums": None,
+        "total_artists": None,
+        "total_album_artist": None,
+    }
+
+
+def fold_run(rollup: dict[str, Any], run: dict[str, Any]) -> None:
+    """
+    Add one pipeline_metrics row to a rollup with parsed stage_histograms.
+    """
+    rollup["runs"] += 1
+    if run["status"] == "success":
+        rollup["failure_streak"] = 0
+        rollup["rows_added"] += run["rows_added"] or 0
+        # rows_added only counts successes, so throughput divides by this
+        rollup["success_duration_seconds"] += run["duration_seconds"] or 0.0
+    else:
+        rollup["failures"] += 1
+        rollup["failure_streak"] += 1
+        rollup["longest_failure_streak"] = max(
+            rollup["longest_failure_streak"], rollup["failure_streak"]
+        )
+    rollup["duration_seconds"] += run["duration_seconds"] or 0.0
+
+    for stage in HISTOGRAM_STAGES:
+        seconds = run[f"{'duration' if stage == 'total' else stage}_seconds"]
+        if seconds is None:
+            continue
+        histogram = rollup["stage_histograms"].setdefault(stage, {})
+        bucket = str(bucket_of(seconds))
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    rollup["last_status"] = run["status"]
+    rollup["last_run_at"] = run["run_at"]
+    for entity in ENTITIES:
+        rollup[f"total_{entity}"] = run[f"total_{entity}"]
+
+
+def _load(rollup: dict[str, Any]) -> dict[str, Any]:
+    return {**rollup, "stage_histograms": json.loads(rollup["stage_histograms"])}
+
+
+def _store(backend: StorageBackend, rollup: dict[str, Any]) -> None:
+    backend.upsert_rollup(
+        {**rollup, "stage_histograms": json.dumps(rollup["stage_histograms"])}
+    )
+
+
+def update_rollup(backend: StorageBackend, run: dict[str, Any]) -> None:
+    """
+    Fold a just recorded run into its day's rollup. Runs are expected to
+    arrive in time order; use rebuild_rollups() after backfilling history.
+
+    The read and the upsert happen under backend.rollup_lock(), so a
+    `serve` job and a `run` logging at the same time both get counted.
+    Runs that commit out of order can still leave the failure streak one
+    step off until the next rebuild.
+    """
+    day = run["run_at"].date()
+    with backend.rollup_lock(run["operation"]):
+        stored = backend.get_rollup(day, run["operation"])
+        if stored is not None:
+            rollup = _load(stored)
+        else:
+            # A failure streak does not reset at midnight.
+            previous = backend.latest_rollup(run["operation"])
+            streak = previous["failure_streak"] if previous else 0
+            rollup = empty_rollup(day, run["operation"], failure_streak=streak)
+        fold_run(rollup, run)
+        _store(backend, rollup)
+
+
+def rebuild_rollups(backend: StorageBackend) -> int:
+    """
+    Recompute pipeline_metrics_daily from every recorded run.
+    Returns the number of rollup rows written.
+    """
+    rollups: dict[tuple[date, str], dict[str, Any]] = {}
+    streaks: dict[str, int] = {}
+    for run in backend.all_pipeline_runs():
+        key = (run["run_at"].date(), run["operation"])
+        if key not in rollups:
+            rollups[key] = empty_rollup(
+                *key, failure_streak=streaks.get(run["operation"], 0)
+            )
+        fold_run(rollups[key], run)
+        streaks[run["operation"]] = rollups[key]["failure_streak"]
+
+    backend.clear_rollups()
+    for rollup in rollups.values():
+        _store(backend, rollup)
+    logger.info("Rebuilt %s pipeline_metrics_daily rows.", len(rollups))
+    return len(rollups)
+
+
+def _stage_percentiles(rollups: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    stages = {}
+    for stage in HISTOGRAM_STAGES:
+        histogram = merge_histograms(
+            [r["stage_histograms"].get(stage, {}) for r in rollups]
+        )
+        stages[stage] = {
+            "runs": sum(histogram.values()),
+            "p50": percentile(histogram, 0.5),
+            "p95": percentile(histogram, 0.95),
+        }
+    return stages
+
+
+def summary(
+    backend: StorageBackend,
+    operation: str = "load_new_releases",
+    days: int = 7,
+    today: date | None = None,
+) -> dict[str, Any]:
+    """
+    Summarise the last `days` days of runs and compare stage timings with
+    the `days` days before them.
+    """
+    today = today or datetime.now(UTC).date()
+    since = today - timedelta(days=days - 1)
+    rollups = [
+        _load(r)
+        for r in backend.rollups_since(operation, since - timedelta(days=days))
+        if r["day"] <= today
+    ]
+    current = [r for r in rollups if r["day"] >= since]
+    previous = [r for r in rollups if r["day"] < since]
+
+    daily = [
+        {
+            "day": r["day"],
+            "runs": r["runs"],
+            "failures": r["failures"],
+            "rows_added": r["rows_added"],
+            "rows_per_second": (
+                r["rows_added"] / r["success_duration_seconds"]
+                if r["success_duration_seconds"]
+                else None
+            ),
+        }
+        for r in current
+    ]
+
+    stages = _stage_percentiles(current)
+    for stage, before in _stage_percentiles(previous).items():
+        now = stages[stage]
+        now["previous_p95"] = before["p95"]
+        now["p95_change"] = (
+            now["p95"] / before["p95"] - 1 if now["p95"] and before["p95"] else None
+        )
+
+    growth = {}
+    if current:
+        # Totals are end-of-day snapshots; growth is measured from the last
+        # snapshot before the window (or the first one in it).
+        baseline = previous[-1] if previous else current[0]
+        latest = current[-1]
+        elapsed = max((latest["day"] - baseline["day"]).days, 1)
+        for entity in ENTITIES:
+            total = latest[f"total_{entity}"]
+            start = baseline[f"total_{entity}"]
+            change = total - start if total is not None and start is not None else None
+            growth[entity] = {
+                "total": total,
+                "change": change,
+                "per_day": change / elapsed if change is not None else None,
+            }
+
+    latest_rollup = backend.latest_rollup(operation)
+    return {
+        "operation": operation,
+        "since": since,
+        "until": today,
+        "runs": sum(r["runs"] for r in current),
+        "failures": sum(r["failures"] for r in current),
+        "daily": daily,
+        "stages": stages,
+        "failure_streak": latest_rollup["failure_streak"] if latest_rollup else 0,
+        "longest_failure_streak": max(
+            (r["longest_failure_streak"] for r in current), default=0
+        ),
+        "last_status": latest_rollup["last_status"] if latest_rollup else None,
+        "growth": growth,
+    }
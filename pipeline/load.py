@@ -1,115 +1,93 @@
 import logging
+import time
 from typing import Any
 
-import psycopg2
-
+from pipeline.changes import create_change_log, detect_changes, record_changes
 from pipeline.metrics import log_pipeline_run
+from pipeline.storage import StorageBackend, create_backend
 
 logger = logging.getLogger(__name__)
 
 
 class LoadSpotify:
-    def __init__(self, database_url: str) -> None:
+    def __init__(
+        self,
+        database_url: str,
+        backend: StorageBackend | None = None,
+        workers: int = 1,
+        change_log: str | None = None,
+    ) -> None:
+        """
+        Args:
+            change_log: "table", an NDJSON file path, or None/"off" to load
+                every album without change tracking.
+        """
         self.database_url = database_url
-        logger.info("LoadSpotify initialized with database URL.")
+        self.backend = backend or create_backend(database_url, workers=workers)
+        self.change_log = create_change_log(change_log, self.backend)
+        logger.info(
+            "LoadSpotify initialized with %s backend.", type(self.backend).__name__
+        )
 
     def load_album(self, clean_album: dict[str, Any]) -> None:
         logger.debug("Logging album into DB: %s", clean_album["album_name"])
-        with psycopg2.connect(self.database_url) as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    INSERT INTO album (
-                        album_id, album_name, album_type, release_date, release_year,
-                        release_date_precision, total_tracks, image_url, spotify_url,
-                        extracted_at, extraction_type, processed_at, data_type
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (album_id) DO UPDATE SET
-                        album_name = EXCLUDED.album_name,
-                        album_type = EXCLUDED.album_type,
-                        release_date = EXCLUDED.release_date,
-                        release_year = EXCLUDED.release_year,
-                        release_date_precision = EXCLUDED.release_date_precision,
-                        total_tracks = EXCLUDED.total_tracks,
-                        image_url = EXCLUDED.image_url,
-                        spotify_url = EXCLUDED.spotify_url,
-                        extracted_at = EXCLUDED.extracted_at,
-                        extraction_type = EXCLUDED.extraction_type,
-                        processed_at = EXCLUDED.processed_at,
-                        data_type = EXCLUDED.data_type;
-                    """,
-                    (
-                        clean_album["album_id"],
-                        clean_album["album_name"],
-                        clean_album["album_type"],
-                        clean_album["release_date"],
-                        clean_album["release_year"],
-                        clean_album["release_date_precision"],
-                        clean_album["total_tracks"],
-                        clean_album["image_url"],
-                        clean_album["spotify_url"],
-                        clean_album["extracted_at"],
-                        clean_album["extraction_type"],
-                        clean_album["processed_at"],
-                        clean_album["data_type"],
-                    ),
-                )
+        self.backend.upsert_albums([clean_album])
+        logger.info("Album loaded: %s", clean_album["album_name"])
 
-                for artist in clean_album.get("artists", []):
-                    cursor.execute(
-                        """
-                        INSERT INTO artist (
-                            artist_id, artist_name, spotify_url,
-                            extracted_at, processed_at
-                        ) VALUES (%s, %s, %s, %s, %s)
-                        ON CONFLICT (artist_id) DO UPDATE SET
-                            artist_name = EXCLUDED.artist_name,
-                            spotify_url = EXCLUDED.spotify_url,
-                            extracted_at = EXCLUDED.extracted_at,
-                            processed_at = EXCLUDED.processed_at;
-                        """,
-                        (
-                            artist["artist_id"],
-                            artist["artist_name"],
-                            artist["spotify_url"],
-                            clean_album["extracted_at"],
-                            clean_album["processed_at"],
-                        ),
-                    )
+    def load_albums(self, clean_albums: list[dict[str, Any]]) -> int:
+        """
+        Returns the number of albums written; with change tracking on,
+        unchanged albums are skipped and not counted.
+        """
+        logger.debug("Loading batch of %s albums into DB.", len(clean_albums))
+        if self.change_log is None:
+            self.backend.upsert_albums(clean_albums)
+            return len(clean_albums)
 
-                    cursor.execute(
-                        """
-                        INSERT INTO album_artist (
-                            album_id, artist_id
-                        ) VALUES (%s, %s)
-                        ON CONFLICT (album_id, artist_id) DO NOTHING;
-                        """,
-                        (
-                            clean_album["album_id"],
-                            artist["artist_id"],
-                        ),
-                    )
+        pending, changes = detect_changes(self.backend, clean_albums)
+        logger.info(
+            "%s of %s albums changed since the last load.",
+            len(pending),
+            len(clean_albums),
+        )
+        if pending:
+            self.backend.upsert_albums(pending)
+        if changes:
+            record_changes(self.backend, self.change_log, changes)
+        return len(pending)
 
-        logger.info("Album loaded: %s", clean_album["album_name"])
-
-    def load_new_releases(self, clean_albums: list[dict[str, Any]]) -> None:
+    def load_new_releases(
+        self,
+        clean_albums: list[dict[str, Any]],
+        stage_seconds: dict[str, float] | None = None,
+    ) -> None:
+        """
+        Args:
+            stage_seconds: Durations of the stages that ran before the load,
+                recorded with the run together with the load's own duration.
+        """
         logger.info("Loading %s albums into DB...", len(clean_albums))
+        stage_seconds = dict(stage_seconds or {})
+        started = time.perf_counter()
         try:
-            for clean_album in clean_albums:
-                self.load_album(clean_album=clean_album)
+            written = self.load_albums(clean_albums=clean_albums)
+            stage_seconds["load"] = time.perf_counter() - started
             log_pipeline_run(
-                database_url=self.database_url,
+                backend=self.backend,
                 operation="load_new_releases",
                 status="success",
-                rows_added=len(clean_albums),
+                rows_added=written,
+                stage_seconds=stage_seconds,
             )
             logger.info("Finished loading albums.")
         except Exception as e:
+            stage_seconds["load"] = time.perf_counter() - started
             log_pipeline_run(
-                database_url=self.database_url,
+                backend=self.backend,
                 operation="load_new_releases",
                 status="failure",
                 rows_added=len(clean_albums),
+                stage_seconds=stage_seconds,
             )
             logger.error("Pipeline failes: %s", e)
             raise
@@ -1,36 +1,28 @@
+import logging
 from datetime import UTC, datetime
 
-import psycopg2
+from pipeline.history import update_rollup
+from pipeline.storage import StorageBackend
+
+logger = logging.getLogger(__name__)
 
 
 def log_pipeline_run(
-    database_url: str, operation: str, status: str, rows_added: int = None
+    backend: StorageBackend,
+    operation: str,
+    status: str,
+    rows_added: int = None,
+    stage_seconds: dict[str, float] | None = None,
 ) -> None:
-    with psycopg2.connect(database_url) as conn:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT COUNT(*) FROM album;")
-            total_albums = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM artist;")
-            total_artists = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM album_artist;")
-            total_album_artist = cursor.fetchone()[0]
-
-            cursor.execute(
-                """
-                INSERT INTO pipeline_metrics (
-                    run_at, operation, status, rows_added,
-                    total_albums, total_artists, total_album_artist
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    datetime.now(UTC),
-                    operation,
-                    status,
-                    rows_added,
-                    total_albums,
-                    total_artists,
-                    total_album_artist,
-                ),
-            )
+    run = backend.record_pipeline_run(
+        run_at=datetime.now(UTC),
+        operation=operation,
+        status=status,
+        rows_added=rows_added,
+        stage_seconds=stage_seconds,
+    )
+    try:
+        update_rollup(backend, run)
+    except Exception:
+        # The run itself is recorded; `main.py status --rebuild` repairs this.
+        logger.warning("Failed to update pipeline_metrics_daily.", exc_info=True)
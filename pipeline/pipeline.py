@@ -1,4 +1,6 @@
+import json
 import logging
+import time
 
 from pipeline.extract import ExtractSpotify
 from pipeline.load import LoadSpotify
@@ -8,15 +10,44 @@ logger = logging.getLogger(__name__)
 
 
 class Pipeline:
-    def __init__(self, database_url: str) -> None:
+    def __init__(
+        self,
+        database_url: str,
+        load_workers: int = 1,
+        change_log: str | None = None,
+    ) -> None:
         self.extractor = ExtractSpotify()
         self.transformer = TransformSpotify()
-        self.loader = LoadSpotify(database_url=database_url)
+        self.loader = LoadSpotify(
+            database_url=database_url, workers=load_workers, change_log=change_log
+        )
         logger.info("Pipeline initialized.")
 
-    def run(self):
+    def run(self, save_raw: str | None = None):
+        """
+        Args:
+            save_raw: Optional path to dump the extracted albums to, so the run
+                can be reproduced later with `main.py replay`.
+        """
         logger.info("Pipeline run started...")
+        stage_seconds: dict[str, float] = {}
+        started = time.perf_counter()
         raw_albums = self.extractor.extract_new_releases(limit=20)
+        stage_seconds["extract"] = time.perf_counter() - started
+        if save_raw:
+            with open(save_raw, "w", encoding="utf-8") as f:
+                json.dump(raw_albums, f)
+            logger.info("Saved %s raw albums to %s.", len(raw_albums), save_raw)
+        started = time.perf_counter()
         clean_albums = self.transformer.transform_new_releases(raw_albums=raw_albums)
-        self.loader.load_new_releases(clean_albums=clean_albums)
+        stage_seconds["transform"] = time.perf_counter() - started
+        self.loader.load_new_releases(
+            clean_albums=clean_albums, stage_seconds=stage_seconds
+        )
+        logger.info("Spotify API requests: %s", self.extractor.client.request_stats())
         logger.info("Pipeline run completed successfully.")
+
+    def close(self) -> None:
+        self.loader.backend.close()
+        self.extractor.client.session.close()
+        logger.info("Pipeline closed.")
@@ -0,0 +1,128 @@
+import logging
+import re
+import signal
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_ALIASES: dict[str, float] = {
+    "@hourly": 3600,
+    "@daily": 86400,
+    "@weekly": 7 * 86400,
+}
+INTERVAL_UNITS: dict[str, float] = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_interval(spec: str) -> float:
+    """
+    Parse a job interval: an alias (@hourly, @daily, @weekly) or a number
+    with a unit, e.g. "90s", "15m", "1h", "2d".
+    """
+    spec = spec.strip().lower()
+    if spec in INTERVAL_ALIASES:
+        return INTERVAL_ALIASES[spec]
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([smhd])", spec)
+    if not match or float(match.group(1)) <= 0:
+        raise ValueError(f"Invalid interval: {spec!r}")
+    return float(match.group(1)) * INTERVAL_UNITS[match.group(2)]
+
+
+@dataclass
+class Job:
+    name: str
+    interval: float
+    func: Callable[[], None]
+    run_on_start: bool = True
+    next_run: float = 0.0
+    running: threading.Lock = field(default_factory=threading.Lock)
+    thread: threading.Thread | None = None
+
+
+class Scheduler:
+    """
+    Runs jobs on fixed intervals inside one long-lived process.
+
+    Each job runs in its own thread so a slow job does not delay the others,
+    but a job is never started while its previous run is still in progress.
+    stop() (also triggered by SIGINT/SIGTERM) stops scheduling new runs and
+    waits for running ones to finish.
+    """
+
+    def __init__(self, jobs: list[Job], shutdown_timeout: float = 300.0) -> None:
+        if len({job.name for job in jobs}) != len(jobs):
+            raise ValueError("Job names must be unique.")
+        self.jobs = jobs
+        self.shutdown_timeout = shutdown_timeout
+        self._stop = threading.Event()
+
+    def stop(self, *_args: object) -> None:
+        if not self._stop.is_set():
+            logger.info("Shutdown requested, waiting for running jobs...")
+        self._stop.set()
+
+    def install_signal_handlers(self) -> None:
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+    def run_forever(self) -> list[str]:
+        """
+        Run until stop(). Returns the names of jobs still running when the
+        shutdown timeout expired; their threads are daemons and die with the
+        process, so anything they use must not be closed under them.
+        """
+        now = time.monotonic()
+        for job in self.jobs:
+            job.next_run = now if job.run_on_start else now + job.interval
+            logger.info("Scheduled job %s every %ss.", job.name, job.interval)
+
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for job in self.jobs:
+                if job.next_run <= now:
+                    self._start(job)
+                    # Fixed rate; if we fell behind, skip the missed runs.
+                    job.next_run += job.interval
+                    if job.next_run <= now:
+                        job.next_run = now + job.interval
+            wake_at = min(job.next_run for job in self.jobs)
+            self._stop.wait(max(0.0, wake_at - time.monotonic()))
+
+        unfinished = self._join_running()
+        logger.info("Scheduler stopped.")
+        return unfinished
+
+    def _start(self, job: Job) -> None:
+        if not job.running.acquire(blocking=False):
+            logger.warning("Job %s is still running, skipping this run.", job.name)
+            return
+        job.thread = threading.Thread(
+            target=self._run_job, args=(job,), name=f"job-{job.name}", daemon=True
+        )
+        job.thread.start()
+
+    def _run_job(self, job: Job) -> None:
+        started = time.monotonic()
+        logger.info("Job %s started.", job.name)
+        try:
+            job.func()
+            logger.info(
+                "Job %s finished in %.1fs.", job.name, time.monotonic() - started
+            )
+        except Exception:
+            logger.exception("Job %s failed.", job.name)
+        finally:
+            job.running.release()
+
+    def _join_running(self) -> list[str]:
+        deadline = time.monotonic() + self.shutdown_timeout
+        unfinished = []
+        for job in self.jobs:
+            if job.thread is not None and job.thread.is_alive():
+                job.thread.join(max(0.0, deadline - time.monotonic()))
+                if job.thread.is_alive():
+                    logger.warning("Job %s did not finish before shutdown.", job.name)
+                    unfinished.append(job.name)
+        return unfinished
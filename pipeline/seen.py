@@ -0,0 +1,317 @@
+"""
+Compact set of seen Spotify IDs for long crawls.
+
+A Spotify ID is 22 base62 characters encoding a 128-bit value, so each ID is
+decoded into two uint64 words and kept in sorted NumPy blocks: 16 bytes per
+ID instead of the ~100 a Python set of strings costs. New IDs go to a small
+set buffer that is flushed into a block, blocks of similar size are merged so
+there are only O(log n) of them, and once resident blocks outgrow the memory
+budget the largest ones are written to disk and memory-mapped.
+
+Blocks are sorted by the low word only; the rare IDs sharing a low word are
+told apart by comparing the high word, so lookups stay exact.
+"""
+
+import logging
+import shutil
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ALPHABET = b"0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+ID_LENGTH = 22
+INVALID_DIGIT = 255
+_DIGITS = np.full(256, INVALID_DIGIT, dtype=np.uint64)
+_DIGITS[np.frombuffer(ALPHABET, dtype=np.uint8)] = np.arange(62, dtype=np.uint64)
+# 62**5 < 2**30, so a group of five digits times a 32-bit limb fits in uint64.
+GROUP_SIZES = (5, 5, 5, 5, 2)
+LIMB_MASK = np.uint64(0xFFFFFFFF)
+LOW_WORD = (1 << 64) - 1
+MERGE_CHUNK = 1 << 18
+
+
+def decode_ids(ids: Iterable[str] | np.ndarray) -> np.ndarray:
+    """
+    Decode base62 IDs into a (2, n) uint64 array of (low, high) words.
+    """
+    raw = ids if isinstance(ids, np.ndarray) else np.asarray(list(ids), dtype=str)
+    try:
+        # One byte wider than an ID, so longer strings are caught below.
+        chars = raw.astype(f"S{ID_LENGTH + 1}")
+    except UnicodeEncodeError as err:
+        raise ValueError("Invalid Spotify ID: expected 22 base62 characters.") from err
+    chars = chars.view(np.uint8).reshape(-1, ID_LENGTH + 1)
+    digits = _DIGITS[chars[:, :ID_LENGTH]]
+    if chars[:, ID_LENGTH].any() or (digits == INVALID_DIGIT).any():
+        raise ValueError("Invalid Spotify ID: expected 22 base62 characters.")
+
+    # Horner's rule over 32-bit limbs, five digits at a time.
+    limbs = [np.zeros(len(chars), dtype=np.uint64) for _ in range(4)]
+    start = 0
+    for size in GROUP_SIZES:
+        group = np.zeros(len(chars), dtype=np.uint64)
+        for column in range(start, start + size):
+            group = group * np.uint64(62) + digits[:, column]
+        start += size
+        carry = group
+        multiplier = np.uint64(62**size)
+        for i, limb in enumerate(limbs):
+            value = limb * multiplier + carry
+            limbs[i] = value & LIMB_MASK
+            carry = value >> np.uint64(32)
+        if carry.any():
+            raise ValueError("Invalid Spotify ID: value does not fit in 128 bits.")
+
+    low = limbs[0] | (limbs[1] << np.uint64(32))
+    high = limbs[2] | (limbs[3] << np.uint64(32))
+    return np.stack([low, high])
+
+
+_DIGIT_OF = {char: digit for digit, char in enumerate(ALPHABET.decode())}
+
+
+def decode_id(spotify_id: str) -> int:
+    """
+    Scalar decode_ids() for single lookups, where NumPy call overhead dominates.
+    """
+    value = 0
+    try:
+        for char in spotify_id:
+            value = value * 62 + _DIGIT_OF[char]
+    except KeyError:
+        value = -1
+    if len(spotify_id) != ID_LENGTH or not 0 <= value < 1 << 128:
+        raise ValueError(f"Invalid Spotify ID: {spotify_id!r}")
+    return value
+
+
+def _block_contains(block: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    left = np.searchsorted(block[0], keys[0], side="left")
+    right = np.searchsorted(block[0], keys[0], side="right")
+    run = right - left
+    found = np.zeros(keys.shape[1], dtype=bool)
+    single = run == 1
+    found[single] = block[1][left[single]] == keys[1][single]
+    for i in np.flatnonzero(run > 1):
+        found[i] = bool((block[1][left[i] : right[i]] == keys[1][i]).any())
+    return found
+
+
+def _sorted_block(keys: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(keys[:, np.argsort(keys[0])])
+
+
+class SeenIds:
+    """
+    Set of Spotify IDs with a bounded resident size.
+
+    Args:
+        memory_budget: Bytes of resident blocks before the largest ones are
+            spilled to `spill_dir`. A merge can exceed it by the size of
+            the block being added (see _merge()), and add_many() decodes
+            its batch with about 200 bytes per ID of temporaries.
+        buffer_size: IDs collected by add() before they become a block.
+        spill_dir: Where spilled blocks go; a temporary directory by default.
+    """
+
+    def __init__(
+        self,
+        memory_budget: int = 256 * 2**20,
+        buffer_size: int = 1 << 16,
+        spill_dir: str | Path | None = None,
+    ) -> None:
+        self.memory_budget = memory_budget
+        self.buffer_size = buffer_size
+        self._spill_dir = Path(spill_dir) if spill_dir else None
+        self._owns_spill_dir = spill_dir is None
+        self._buffer: set[int] = set()
+        self._blocks: list[np.ndarray] = []
+        self._spilled = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, spotify_id: str) -> bool:
+        key = decode_id(spotify_id)
+        return key in self._buffer or self._key_in_blocks(key)
+
+    def add(self, spotify_id: str) -> bool:
+        """
+        Add one ID; returns True if it had not been seen before.
+        """
+        key = decode_id(spotify_id)
+        if key in self._buffer or self._key_in_blocks(key):
+            return False
+        self._buffer.add(key)
+        self._size += 1
+        if len(self._buffer) >= self.buffer_size:
+            self._flush_buffer()
+        return True
+
+    def add_many(self, ids: Iterable[str] | np.ndarray) -> np.ndarray:
+        """
+        Add a batch of IDs. Returns a mask of the ones not seen before; an ID
+        repeated within the batch counts as new only the first time.
+        """
+        self._flush_buffer()
+        keys = decode_ids(ids)
+        if not keys.shape[1]:
+            return np.zeros(0, dtype=bool)
+        # lexsort is stable, so the first of each run of duplicates is the
+        # earliest occurrence in the batch.
+        order = np.lexsort((keys[1], keys[0]))
+        ordered = keys[:, order]
+        duplicate = np.zeros(keys.shape[1], dtype=bool)
+        duplicate[1:] = (ordered[:, 1:] == ordered[:, :-1]).all(axis=0)
+        unique = ordered[:, ~duplicate]
+        fresh = ~self._in_blocks(unique)
+        if fresh.any():
+            self._add_block(np.ascontiguousarray(unique[:, fresh]))
+            self._size += int(fresh.sum())
+
+        new = np.zeros(keys.shape[1], dtype=bool)
+        new[order[~duplicate][fresh]] = True
+        return new
+
+    def contains_many(self, ids: Iterable[str] | np.ndarray) -> np.ndarray:
+        keys = decode_ids(ids)
+        found = self._in_blocks(keys)
+        if self._buffer:
+            for i in np.flatnonzero(~found):
+                key = int(keys[1, i]) << 64 | int(keys[0, i])
+                found[i] = key in self._buffer
+        return found
+
+    @property
+    def resident_bytes(self) -> int:
+        """
+        Bytes held in memory by blocks and the add() buffer (approximate).
+        """
+        blocks = sum(b.nbytes for b in self._blocks if not isinstance(b, np.memmap))
+        # a set slot plus a 128-bit int object
+        return blocks + len(self._buffer) * 80
+
+    @property
+    def spilled_bytes(self) -> int:
+        return sum(b.nbytes for b in self._blocks if isinstance(b, np.memmap))
+
+    def close(self) -> None:
+        self._blocks.clear()
+        self._buffer.clear()
+        self._size = 0
+        if self._owns_spill_dir and self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def _in_blocks(self, keys: np.ndarray) -> np.ndarray:
+        found = np.zeros(keys.shape[1], dtype=bool)
+        for block in self._blocks:
+            pending = ~found
+            if not pending.any():
+                break
+            found[pending] = _block_contains(block, keys[:, pending])
+        return found
+
+    def _key_in_blocks(self, key: int) -> bool:
+        low, high = np.uint64(key & LOW_WORD), np.uint64(key >> 64)
+        for block in self._blocks:
+            i = int(block[0].searchsorted(low))
+            while i < block.shape[1] and block[0, i] == low:
+                if block[1, i] == high:
+                    return True
+                i += 1
+        return False
+
+    def _flush_buffer(self) -> None:
+        if not self._buffer:
+            return
+        values = np.array(
+            [(k & LOW_WORD, k >> 64) for k in self._buffer], dtype=np.uint64
+        )
+        self._buffer.clear()
+        self._add_block(_sorted_block(values.T))
+
+    def _add_block(self, block: np.ndarray) -> None:
+        self._blocks.append(block)
+        # Binary-counter merging keeps block sizes roughly halving.
+        while (
+            len(self._blocks) > 1
+            and self._blocks[-2].shape[1] <= 2 * self._blocks[-1].shape[1]
+        ):
+            newer = self._blocks.pop()
+            older = self._blocks.pop()
+            self._blocks.append(self._merge(older, newer))
+            self._delete_spilled(older)
+            self._delete_spilled(newer)
+        self._enforce_budget()
+
+    def _merge(self, older: np.ndarray, newer: np.ndarray) -> np.ndarray:
+        """
+        Linear merge of two sorted blocks, written straight to a spill file
+        when the result would not fit in the memory budget.
+
+        The inputs stay in memory until the merge is done, so resident inputs
+        count against the budget along with the result. Keys are placed
+        MERGE_CHUNK newer keys at a time, which keeps the position and mask
+        temporaries small: with resident blocks within budget before the
+        newest block arrived, a merge peaks at the budget plus that block.
+        """
+        size = older.shape[1] + newer.shape[1]
+        inputs = sum(b.nbytes for b in (older, newer) if not isinstance(b, np.memmap))
+        if self.resident_bytes + inputs + 16 * size > self.memory_budget:
+            merged = np.lib.format.open_memmap(
+                self._spill_path(), mode="w+", dtype=np.uint64, shape=(2, size)
+            )
+        else:
+            merged = np.empty((2, size), dtype=np.uint64)
+
+        out = taken = 0
+        for start in range(0, newer.shape[1], MERGE_CHUNK):
+            chunk = newer[:, start : start + MERGE_CHUNK]
+            # Where each key of the chunk lands among the older keys it spans.
+            positions = np.searchsorted(older[0], chunk[0], side="right")
+            span = older[:, taken : positions[-1]]
+            from_newer = np.zeros(span.shape[1] + chunk.shape[1], dtype=bool)
+            from_newer[positions - taken + np.arange(chunk.shape[1])] = True
+            section = merged[:, out : out + len(from_newer)]
+            for word in range(2):
+                section[word, from_newer] = chunk[word]
+                section[word, ~from_newer] = span[word]
+            out += len(from_newer)
+            taken = int(positions[-1])
+        merged[:, out:] = older[:, taken:]
+        if isinstance(merged, np.memmap):
+            merged.flush()
+        return merged
+
+    def _enforce_budget(self) -> None:
+        while self.resident_bytes > self.memory_budget:
+            resident = [
+                i for i, b in enumerate(self._blocks) if not isinstance(b, np.memmap)
+            ]
+            if not resident:
+                return
+            largest = max(resident, key=lambda i: self._blocks[i].nbytes)
+            self._blocks[largest] = self._spill(self._blocks[largest])
+
+    def _spill_path(self) -> Path:
+        if self._spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix="seen-ids-"))
+        self._spilled += 1
+        return self._spill_dir / f"block-{self._spilled}.npy"
+
+    def _spill(self, block: np.ndarray) -> np.memmap:
+        path = self._spill_path()
+        np.save(path, block)
+        logger.debug("Spilled %s seen IDs to %s.", block.shape[1], path)
+        return np.load(path, mmap_mode="r")
+
+    @staticmethod
+    def _delete_spilled(block: np.ndarray) -> None:
+        if isinstance(block, np.memmap):
+            Path(block.filename).unlink(missing_ok=True)
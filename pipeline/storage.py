@@ -0,0 +1,808 @@
+import logging
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import UTC, date, datetime
+from pathlib import Path
+from typing import Any
+
+from psycopg2 import OperationalError
+from psycopg2.extras import execute_batch, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+logger = logging.getLogger(__name__)
+
+DUCKDB_SCHEME = "duckdb://"
+DUCKDB_SCHEMA_PATH = Path(__file__).resolve().parent.parent / "db" / "schema_duckdb.sql"
+
+ALBUM_COLUMNS: tuple[str, ...] = (
+    "album_id",
+    "album_name",
+    "album_type",
+    "release_date",
+    "release_year",
+    "release_date_precision",
+    "total_tracks",
+    "image_url",
+    "spotify_url",
+    "extracted_at",
+    "extraction_type",
+    "processed_at",
+    "data_type",
+)
+ARTIST_COLUMNS: tuple[str, ...] = (
+    "artist_id",
+    "artist_name",
+    "spotify_url",
+    "extracted_at",
+    "processed_at",
+)
+ALBUM_ARTIST_COLUMNS: tuple[str, ...] = ("album_id", "artist_id")
+STAGES: tuple[str, ...] = ("extract", "transform", "load")
+METRICS_COLUMNS: tuple[str, ...] = (
+    "run_at",
+    "operation",
+    "status",
+    "rows_added",
+    "total_albums",
+    "total_artists",
+    "total_album_artist",
+    "extract_seconds",
+    "transform_seconds",
+    "load_seconds",
+    "duration_seconds",
+)
+ROLLUP_COLUMNS: tuple[str, ...] = (
+    "day",
+    "operation",
+    "runs",
+    "failures",
+    "rows_added",
+    "duration_seconds",
+    "success_duration_seconds",
+    "stage_histograms",
+    "failure_streak",
+    "longest_failure_streak",
+    "last_status",
+    "last_run_at",
+    "total_albums",
+    "total_artists",
+    "total_album_artist",
+)
+
+# Queries shared by every backend use %s placeholders; DuckDBBackend
+# rewrites them to ?.
+COUNT_TOTALS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM album),
+        (SELECT COUNT(*) FROM artist),
+        (SELECT COUNT(*) FROM album_artist);
+"""
+INSERT_METRICS_SQL = f"""
+    INSERT INTO pipeline_metrics ({", ".join(METRICS_COLUMNS)})
+    VALUES ({", ".join(["%s"] * len(METRICS_COLUMNS))});
+"""  # noqa: S608
+RECENT_RUNS_SQL = f"""
+    SELECT {", ".join(METRICS_COLUMNS)}
+    FROM pipeline_metrics
+    ORDER BY run_at DESC, id DESC
+    LIMIT %s;
+"""  # noqa: S608
+ALL_RUNS_SQL = f"""
+    SELECT {", ".join(METRICS_COLUMNS)}
+    FROM pipeline_metrics
+    ORDER BY run_at, id;
+"""  # noqa: S608
+ROLLUP_SELECT_SQL = f"""
+    SELECT {", ".join(ROLLUP_COLUMNS)}
+    FROM pipeline_metrics_daily
+"""  # noqa: S608
+ROLLUP_UPSERT_SQL = f"""
+    INSERT INTO pipeline_metrics_daily ({", ".join(ROLLUP_COLUMNS)})
+    VALUES ({", ".join(["%s"] * len(ROLLUP_COLUMNS))})
+    ON CONFLICT (day, operation) DO UPDATE SET
+        {", ".join(f"{c} = EXCLUDED.{c}" for c in ROLLUP_COLUMNS[2:])};
+"""  # noqa: S608
+
+# entity -> (table, key column) tracked by the change log
+TRACKED_ENTITIES: dict[str, tuple[str, str]] = {
+    "album": ("album", "album_id"),
+    "artist": ("artist", "artist_id"),
+}
+CHANGE_COLUMNS: tuple[str, ...] = (
+    "log_offset",
+    "recorded_at",
+    "entity",
+    "entity_key",
+    "op",
+    "before_hash",
+    "after_hash",
+)
+CONTENT_HASH_UPSERT_SQL = """
+    INSERT INTO content_hash (entity, entity_key, content_hash)
+    VALUES (%s, %s, %s)
+    ON CONFLICT (entity, entity_key) DO UPDATE SET
+        content_hash = EXCLUDED.content_hash;
+"""
+CONTENT_HASH_DELETE_SQL = """
+    DELETE FROM content_hash WHERE entity = %s AND entity_key = %s;
+"""
+CHANGE_LOG_INSERT_SQL = f"""
+    INSERT INTO change_log ({", ".join(CHANGE_COLUMNS[1:])})
+    VALUES ({", ".join(["%s"] * (len(CHANGE_COLUMNS) - 1))});
+"""  # noqa: S608
+CHANGE_LOG_READ_SQL = f"""
+    SELECT {", ".join(CHANGE_COLUMNS)}
+    FROM change_log
+    WHERE log_offset > %s
+    ORDER BY log_offset
+    LIMIT %s;
+"""  # noqa: S608
+
+ALBUM_UPSERT_VALUES_SQL = """
+    INSERT INTO album (
+        album_id, album_name, album_type, release_date, release_year,
+        release_date_precision, total_tracks, image_url, spotify_url,
+        extracted_at, extraction_type, processed_at, data_type
+    ) VALUES %s
+    ON CONFLICT (album_id) DO UPDATE SET
+        album_name = EXCLUDED.album_name,
+        album_type = EXCLUDED.album_type,
+        release_date = EXCLUDED.release_date,
+        release_year = EXCLUDED.release_year,
+        release_date_precision = EXCLUDED.release_date_precision,
+        total_tracks = EXCLUDED.total_tracks,
+        image_url = EXCLUDED.image_url,
+        spotify_url = EXCLUDED.spotify_url,
+        extracted_at = EXCLUDED.extracted_at,
+        extraction_type = EXCLUDED.extraction_type,
+        processed_at = EXCLUDED.processed_at,
+        data_type = EXCLUDED.data_type;
+"""
+ARTIST_UPSERT_VALUES_SQL = """
+    INSERT INTO artist (
+        artist_id, artist_name, spotify_url,
+        extracted_at, processed_at
+    ) VALUES %s
+    ON CONFLICT (artist_id) DO UPDATE SET
+        artist_name = EXCLUDED.artist_name,
+        spotify_url = EXCLUDED.spotify_url,
+        extracted_at = EXCLUDED.extracted_at,
+        processed_at = EXCLUDED.processed_at;
+"""
+ALBUM_ARTIST_INSERT_VALUES_SQL = """
+    INSERT INTO album_artist (album_id, artist_id) VALUES %s
+    ON CONFLICT (album_id, artist_id) DO NOTHING;
+"""
+
+
+def album_row(clean_album: dict[str, Any]) -> tuple[Any, ...]:
+    return tuple(clean_album[column] for column in ALBUM_COLUMNS)
+
+
+def artist_row(artist: dict[str, Any], clean_album: dict[str, Any]) -> tuple[Any, ...]:
+    return (
+        artist["artist_id"],
+        artist["artist_name"],
+        artist["spotify_url"],
+        clean_album["extracted_at"],
+        clean_album["processed_at"],
+    )
+
+
+def collapse_batch(
+    clean_albums: list[dict[str, Any]],
+) -> tuple[list[tuple[Any, ...]], list[tuple[Any, ...]], list[tuple[str, str]]]:
+    """
+    Split a batch into album, artist and album_artist rows, one row per key.
+
+    ON CONFLICT DO UPDATE cannot touch the same key twice in one statement, so
+    duplicates are collapsed first (last occurrence wins, as it would row-by-row).
+    """
+    albums: dict[str, tuple[Any, ...]] = {}
+    artists: dict[str, tuple[Any, ...]] = {}
+    links: dict[tuple[str, str], tuple[str, str]] = {}
+    for clean_album in clean_albums:
+        albums[clean_album["album_id"]] = album_row(clean_album)
+        for artist in clean_album.get("artists", []):
+            artists[artist["artist_id"]] = artist_row(artist, clean_album)
+            link = (clean_album["album_id"], artist["artist_id"])
+            links[link] = link
+    return list(albums.values()), list(artists.values()), list(links.values())
+
+
+def shard_of(album_id: str, shards: int) -> int:
+    # crc32 rather than hash(): str hashing is salted per process
+    return zlib.crc32(album_id.encode()) % shards
+
+
+class StorageBackend(ABC):
+    """
+    Warehouse used by LoadSpotify and log_pipeline_run.
+
+    Implementations must upsert albums and artists on their primary keys and
+    ignore album_artist links that already exist.
+    """
+
+    @abstractmethod
+    def upsert_albums(self, clean_albums: list[dict[str, Any]]) -> None: ...
+
+    @abstractmethod
+    def _execute(self, query: str, params: Sequence[Any] = ()) -> None: ...
+
+    @abstractmethod
+    def _fetch_all(
+        self, query: str, params: Sequence[Any] = ()
+    ) -> list[tuple[Any, ...]]: ...
+
+    @abstractmethod
+    def _execute_many(self, query: str, rows: Sequence[Sequence[Any]]) -> None: ...
+
+    def _fetch_dicts(
+        self, query: str, columns: tuple[str, ...], params: Sequence[Any] = ()
+    ) -> list[dict[str, Any]]:
+        return [
+            dict(zip(columns, row, strict=True))
+            for row in self._fetch_all(query, params)
+        ]
+
+    def record_pipeline_run(
+        self,
+        run_at: datetime,
+        operation: str,
+        status: str,
+        rows_added: int | None,
+        stage_seconds: dict[str, float] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Insert one pipeline_metrics row, with table totals taken after the run,
+        and return it.
+        """
+        stage_seconds = stage_seconds or {}
+        totals = self._fetch_all(COUNT_TOTALS_SQL)[0]
+        durations = [stage_seconds.get(stage) for stage in STAGES]
+        run = dict(
+            zip(
+                METRICS_COLUMNS,
+                (
+                    # pipeline_metrics.run_at is a naive UTC timestamp
+                    run_at.astimezone(UTC).replace(tzinfo=None),
+                    operation,
+                    status,
+                    rows_added,
+                    *totals,
+                    *durations,
+                    sum(stage_seconds.values()) if stage_seconds else None,
+                ),
+                strict=True,
+            )
+        )
+        self._execute(INSERT_METRICS_SQL, list(run.values()))
+        return run
+
+    def recent_pipeline_runs(self, limit: int = 10) -> list[dict[str, Any]]:
+        return self._fetch_dicts(RECENT_RUNS_SQL, METRICS_COLUMNS, [limit])
+
+    def all_pipeline_runs(self) -> list[dict[str, Any]]:
+        return self._fetch_dicts(ALL_RUNS_SQL, METRICS_COLUMNS)
+
+    def get_rollup(self, day: date, operation: str) -> dict[str, Any] | None:
+        rows = self._fetch_dicts(
+            ROLLUP_SELECT_SQL + " WHERE day = %s AND operation = %s;",
+            ROLLUP_COLUMNS,
+            [day, operation],
+        )
+        return rows[0] if rows else None
+
+    def latest_rollup(self, operation: str) -> dict[str, Any] | None:
+        rows = self._fetch_dicts(
+            ROLLUP_SELECT_SQL + " WHERE operation = %s ORDER BY day DESC LIMIT 1;",
+            ROLLUP_COLUMNS,
+            [operation],
+        )
+        return rows[0] if rows else None
+
+    def rollups_since(self, operation: str, since: date) -> list[dict[str, Any]]:
+        return self._fetch_dicts(
+            ROLLUP_SELECT_SQL + " WHERE operation = %s AND day >= %s ORDER BY day;",
+            ROLLUP_COLUMNS,
+            [operation, since],
+        )
+
+    def upsert_rollup(self, rollup: dict[str, Any]) -> None:
+        self._execute(ROLLUP_UPSERT_SQL, [rollup[c] for c in ROLLUP_COLUMNS])
+
+    def clear_rollups(self) -> None:
+        self._execute("DELETE FROM pipeline_metrics_daily;")
+
+    @contextmanager
+    def rollup_lock(self, operation: str) -> Iterator[None]:  # noqa: ARG002
+        """
+        Held by history.update_rollup() while it reads and rewrites the
+        operation's rollup, so two writers cannot both fold into the same
+        stored row. This default does no locking and suits a single writer.
+        """
+        yield
+
+    def stored_hashes(self, entity: str, keys: list[str]) -> dict[str, str | None]:
+        """
+        Content hashes of the keys already in the entity's table. Rows loaded
+        before change tracking was enabled map to None.
+        """
+        if not keys:
+            return {}
+        table, key = TRACKED_ENTITIES[entity]
+        return dict(
+            self._fetch_all(
+                f"""
+                SELECT t.{key}, h.content_hash
+                FROM {table} t
+                LEFT JOIN content_hash h
+                    ON h.entity = %s AND h.entity_key = t.{key}
+                WHERE t.{key} IN (SELECT unnest(%s));
+                """,  # noqa: S608
+                [entity, keys],
+            )
+        )
+
+    def save_hashes(self, changes: list[dict[str, Any]]) -> None:
+        self._execute_many(
+            CONTENT_HASH_UPSERT_SQL,
+            [
+                (c["entity"], c["entity_key"], c["after_hash"])
+                for c in changes
+                if c["after_hash"] is not None
+            ],
+        )
+        self._execute_many(
+            CONTENT_HASH_DELETE_SQL,
+            [
+                (c["entity"], c["entity_key"])
+                for c in changes
+                if c["after_hash"] is None
+            ],
+        )
+
+    def append_changes(self, changes: list[dict[str, Any]]) -> None:
+        self._execute_many(
+            CHANGE_LOG_INSERT_SQL,
+            [[change[column] for column in CHANGE_COLUMNS[1:]] for change in changes],
+        )
+
+    def read_changes(
+        self, since: int = 0, limit: int | None = None
+    ) -> list[dict[str, Any]]:
+        return self._fetch_dicts(CHANGE_LOG_READ_SQL, CHANGE_COLUMNS, [since, limit])
+
+    def close(self) -> None:  # noqa: B027
+        pass
+
+
+class PostgresBackend(StorageBackend):
+    """
+    Connections come from a lazily created pool that lives as long as the
+    backend, so repeated loads in one process reuse them.
+    """
+
+    def __init__(self, database_url: str, max_connections: int = 4) -> None:
+        self.database_url = database_url
+        self.max_connections = max_connections
+        self._pool: ThreadedConnectionPool | None = None
+        # The cursor of the transaction this thread has open, if any.
+        self._local = threading.local()
+
+    def _get_pool(self) -> ThreadedConnectionPool:
+        if self._pool is None:
+            self._pool = ThreadedConnectionPool(
+                minconn=1, maxconn=self.max_connections, dsn=self.database_url
+            )
+        return self._pool
+
+    def _checkout(self, pool: ThreadedConnectionPool) -> Any:
+        """
+        A pooled connection the server or a pooler dropped while the process
+        was idle still has closed == 0 until it is used, so each one is
+        pinged before use. Every idle connection may be dead after a server
+        restart, hence one attempt per pool slot before opening a new one.
+        """
+        for _ in range(self.max_connections):
+            conn = pool.getconn()
+            if not conn.closed:
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT 1;")
+                    conn.rollback()
+                    return conn
+                except OperationalError:
+                    pass
+            logger.info("Discarding a dead pooled Postgres connection.")
+            pool.putconn(conn, close=True)
+        return pool.getconn()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[Any]:
+        """
+        A transaction on a pooled connection. Called again on a thread that
+        already has one open, it joins that transaction instead.
+        """
+        current = getattr(self._local, "cursor", None)
+        if current is not None:
+            yield current
+            return
+        pool = self._get_pool()
+        conn = self._checkout(pool)
+        try:
+            with conn as tx_conn:
+                with tx_conn.cursor() as cursor:
+                    self._local.cursor = cursor
+                    try:
+                        yield cursor
+                    finally:
+                        self._local.cursor = None
+        finally:
+            # A connection that broke during the transaction is not reused.
+            pool.putconn(conn, close=bool(conn.closed))
+
+    @contextmanager
+    def rollup_lock(self, operation: str) -> Iterator[None]:
+        """
+        The rollup reads and upsert run in one transaction holding an advisory
+        lock per operation. A row lock would not do: the first run of a day
+        has no row to lock yet.
+        """
+        with self._transaction() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(hashtext(%s));",
+                [f"pipeline_metrics_daily:{operation}"],
+            )
+            yield
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+
+    def upsert_albums(self, clean_albums: list[dict[str, Any]]) -> None:
+        with self._transaction() as cursor:
+            for clean_album in clean_albums:
+                self._upsert_album(cursor, clean_album)
+
+    def _upsert_album(self, cursor: Any, clean_album: dict[str, Any]) -> None:
+        cursor.execute(
+            """
+            INSERT INTO album (
+                album_id, album_name, album_type, release_date, release_year,
+                release_date_precision, total_tracks, image_url, spotify_url,
+                extracted_at, extraction_type, processed_at, data_type
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (album_id) DO UPDATE SET
+                album_name = EXCLUDED.album_name,
+                album_type = EXCLUDED.album_type,
+                release_date = EXCLUDED.release_date,
+                release_year = EXCLUDED.release_year,
+                release_date_precision = EXCLUDED.release_date_precision,
+                total_tracks = EXCLUDED.total_tracks,
+                image_url = EXCLUDED.image_url,
+                spotify_url = EXCLUDED.spotify_url,
+                extracted_at = EXCLUDED.extracted_at,
+                extraction_type = EXCLUDED.extraction_type,
+                processed_at = EXCLUDED.processed_at,
+                data_type = EXCLUDED.data_type;
+            """,
+            album_row(clean_album),
+        )
+
+        for artist in clean_album.get("artists", []):
+            cursor.execute(
+                """
+                INSERT INTO artist (
+                    artist_id, artist_name, spotify_url,
+                    extracted_at, processed_at
+                ) VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (artist_id) DO UPDATE SET
+                    artist_name = EXCLUDED.artist_name,
+                    spotify_url = EXCLUDED.spotify_url,
+                    extracted_at = EXCLUDED.extracted_at,
+                    processed_at = EXCLUDED.processed_at;
+                """,
+                artist_row(artist, clean_album),
+            )
+
+            cursor.execute(
+                """
+                INSERT INTO album_artist (
+                    album_id, artist_id
+                ) VALUES (%s, %s)
+                ON CONFLICT (album_id, artist_id) DO NOTHING;
+                """,
+                (
+                    clean_album["album_id"],
+                    artist["artist_id"],
+                ),
+            )
+
+    def _execute(self, query: str, params: Sequence[Any] = ()) -> None:
+        with self._transaction() as cursor:
+            cursor.execute(query, params)
+
+    def _fetch_all(
+        self, query: str, params: Sequence[Any] = ()
+    ) -> list[tuple[Any, ...]]:
+        with self._transaction() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+    def _execute_many(self, query: str, rows: Sequence[Sequence[Any]]) -> None:
+        if not rows:
+            return
+        with self._transaction() as cursor:
+            execute_batch(cursor, query, rows, page_size=1000)
+
+
+class ShardedPostgresBackend(PostgresBackend):
+    """
+    Parallel Postgres loader for large backfills.
+
+    Albums are sharded by a stable hash of album_id across `workers` pooled
+    connections. Each shard upserts its albums and then its artists in one
+    transaction, with artists sorted by artist_id so concurrent shards take
+    row locks in the same order and cannot deadlock on shared artists.
+    album_artist links are written in a second phase, only after every shard
+    has committed its parent rows.
+    """
+
+    def __init__(self, database_url: str, workers: int) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        super().__init__(database_url, max_connections=workers)
+        self.workers = workers
+
+    def shard_batch(
+        self, clean_albums: list[dict[str, Any]]
+    ) -> list[tuple[list[tuple[Any, ...]], ...]]:
+        shards: list[list[dict[str, Any]]] = [[] for _ in range(self.workers)]
+        for clean_album in clean_albums:
+            shards[shard_of(clean_album["album_id"], self.workers)].append(clean_album)
+
+        prepared = []
+        for shard in shards:
+            if not shard:
+                continue
+            albums, artists, links = collapse_batch(shard)
+            prepared.append((sorted(albums), sorted(artists), sorted(links)))
+        return prepared
+
+    def upsert_albums(self, clean_albums: list[dict[str, Any]]) -> None:
+        shards = self.shard_batch(clean_albums)
+        logger.debug(
+            "Loading %s albums across %s shards.", len(clean_albums), len(shards)
+        )
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="load-shard"
+        ) as executor:
+            # Consuming map() re-raises the first shard failure, so links are
+            # never written unless every parent row has been committed.
+            list(executor.map(self._upsert_parents, shards))
+            list(executor.map(self._insert_links, shards))
+
+    def _run_in_transaction(self, statements: list[tuple[str, list]]) -> None:
+        with self._transaction() as cursor:
+            for query, rows in statements:
+                if rows:
+                    execute_values(cursor, query, rows, page_size=len(rows))
+
+    def _upsert_parents(self, shard: tuple[list[tuple[Any, ...]], ...]) -> None:
+        albums, artists, _ = shard
+        self._run_in_transaction(
+            [(ALBUM_UPSERT_VALUES_SQL, albums), (ARTIST_UPSERT_VALUES_SQL, artists)]
+        )
+
+    def _insert_links(self, shard: tuple[list[tuple[Any, ...]], ...]) -> None:
+        _, _, links = shard
+        self._run_in_transaction([(ALBUM_ARTIST_INSERT_VALUES_SQL, links)])
+
+
+class DuckDBBackend(StorageBackend):
+    """
+    Embedded DuckDB warehouse for local development, CI and benchmarks.
+
+    Batches are written column-wise: rows are turned into a pandas DataFrame
+    that DuckDB scans directly, so a whole batch is a single
+    INSERT ... SELECT ... ON CONFLICT statement per table.
+    """
+
+    ALBUM_TYPES: tuple[str, ...] = (
+        "VARCHAR",
+        "VARCHAR",
+        "VARCHAR",
+        "DATE",
+        "INTEGER",
+        "VARCHAR",
+        "INTEGER",
+        "VARCHAR",
+        "VARCHAR",
+        "TIMESTAMPTZ",
+        "VARCHAR",
+        "TIMESTAMPTZ",
+        "VARCHAR",
+    )
+    ARTIST_TYPES: tuple[str, ...] = (
+        "VARCHAR",
+        "VARCHAR",
+        "VARCHAR",
+        "TIMESTAMPTZ",
+        "TIMESTAMPTZ",
+    )
+    ALBUM_ARTIST_TYPES: tuple[str, ...] = ("VARCHAR", "VARCHAR")
+    # change_log columns without log_offset, which comes from a sequence
+    CHANGE_TYPES: tuple[str, ...] = (
+        "TIMESTAMP",
+        "VARCHAR",
+        "VARCHAR",
+        "VARCHAR",
+        "VARCHAR",
+        "VARCHAR",
+    )
+
+    def __init__(self, path: str) -> None:
+        try:
+            import duckdb
+        except ImportError as err:
+            raise ImportError(
+                "DuckDB backend requires the 'duckdb' package (uv sync --extra duckdb)."
+            ) from err
+
+        self.path = path
+        self.conn = duckdb.connect(path)
+        self._rollup_lock = threading.Lock()
+        self.conn.execute(DUCKDB_SCHEMA_PATH.read_text(encoding="utf-8"))
+        self.conn.execute("SET schema = 'public';")
+        logger.info("DuckDB backend opened at %s.", path)
+
+    @classmethod
+    def from_url(cls, database_url: str) -> "DuckDBBackend":
+        """
+        duckdb://:memory:, duckdb://relative.duckdb or duckdb:///abs/path.duckdb
+        """
+        return cls(database_url.removeprefix(DUCKDB_SCHEME) or ":memory:")
+
+    def upsert_albums(self, clean_albums: list[dict[str, Any]]) -> None:
+        albums, artists, links = collapse_batch(clean_albums)
+
+        self.conn.begin()
+        try:
+            self._bulk_upsert(
+                "album", ALBUM_COLUMNS, self.ALBUM_TYPES, ("album_id",), albums
+            )
+            self._bulk_upsert(
+                "artist", ARTIST_COLUMNS, self.ARTIST_TYPES, ("artist_id",), artists
+            )
+            self._bulk_upsert(
+                "album_artist",
+                ALBUM_ARTIST_COLUMNS,
+                self.ALBUM_ARTIST_TYPES,
+                ALBUM_ARTIST_COLUMNS,
+                links,
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def _bulk_upsert(
+        self,
+        table: str,
+        columns: tuple[str, ...],
+        types: tuple[str, ...],
+        key: tuple[str, ...],
+        rows: list[tuple[Any, ...]],
+    ) -> None:
+        if not rows:
+            return
+        import pandas as pd
+
+        updates = [c for c in columns if c not in key]
+        select_list = ", ".join(
+            f"{column}::{type_} AS {column}"
+            for column, type_ in zip(columns, types, strict=True)
+        )
+        if updates:
+            conflict = "DO UPDATE SET " + ", ".join(
+                f"{c} = EXCLUDED.{c}" for c in updates
+            )
+        else:
+            conflict = "DO NOTHING"
+
+        view = f"{table}_batch"
+        query = (
+            f"INSERT INTO {table} ({', '.join(columns)}) "  # noqa: S608
+            f"SELECT {select_list} FROM {view}"
+        )
+        if key:
+            query += f" ON CONFLICT ({', '.join(key)}) {conflict}"
+        # object dtype keeps None as NULL instead of coercing int columns to NaN
+        batch = pd.DataFrame.from_records(rows, columns=columns).astype(object)
+        self.conn.register(view, batch)
+        try:
+            self.conn.execute(query)
+        finally:
+            self.conn.unregister(view)
+
+    def save_hashes(self, changes: list[dict[str, Any]]) -> None:
+        self._bulk_upsert(
+            "content_hash",
+            ("entity", "entity_key", "content_hash"),
+            ("VARCHAR", "VARCHAR", "VARCHAR"),
+            ("entity", "entity_key"),
+            [
+                (c["entity"], c["entity_key"], c["after_hash"])
+                for c in changes
+                if c["after_hash"] is not None
+            ],
+        )
+        self._execute_many(
+            CONTENT_HASH_DELETE_SQL,
+            [
+                (c["entity"], c["entity_key"])
+                for c in changes
+                if c["after_hash"] is None
+            ],
+        )
+
+    def append_changes(self, changes: list[dict[str, Any]]) -> None:
+        self._bulk_upsert(
+            "change_log",
+            CHANGE_COLUMNS[1:],
+            self.CHANGE_TYPES,
+            (),
+            [tuple(change[c] for c in CHANGE_COLUMNS[1:]) for change in changes],
+        )
+
+    @contextmanager
+    def rollup_lock(self, operation: str) -> Iterator[None]:  # noqa: ARG002
+        """
+        Only one process can open a DuckDB file for writing, so serialising
+        this backend's threads and wrapping the update in a transaction is
+        enough.
+        """
+        with self._rollup_lock:
+            self.conn.begin()
+            try:
+                yield
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def _execute(self, query: str, params: Sequence[Any] = ()) -> None:
+        self.conn.execute(query.replace("%s", "?"), list(params))
+
+    def _fetch_all(
+        self, query: str, params: Sequence[Any] = ()
+    ) -> list[tuple[Any, ...]]:
+        return self.conn.execute(query.replace("%s", "?"), list(params)).fetchall()
+
+    def _execute_many(self, query: str, rows: Sequence[Sequence[Any]]) -> None:
+        if rows:
+            self.conn.executemany(query.replace("%s", "?"), [list(r) for r in rows])
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def create_backend(database_url: str, workers: int = 1) -> StorageBackend:
+    """
+    Pick a backend from the URL scheme: duckdb:// for the embedded warehouse,
+    anything else is handed to psycopg2 as a Postgres DSN. With workers > 1
+    Postgres loads are sharded across that many connections.
+    """
+    if database_url.startswith(DUCKDB_SCHEME):
+        if workers > 1:
+            logger.warning("DuckDB has a single writer, ignoring workers=%s.", workers)
+        return DuckDBBackend.from_url(database_url)
+    if workers > 1:
+        return ShardedPostgresBackend(database_url, workers=workers)
+    return PostgresBackend(database_url)
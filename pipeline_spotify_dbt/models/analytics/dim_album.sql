@@ -5,7 +5,9 @@ select
     album_name,
     album_type,
     release_date,
+    release_year,
     total_tracks,
     image_url,
-    spotify_url
+    spotify_url,
+    processed_at
 from {{ ref('stg_album') }}
\ No newline at end of file
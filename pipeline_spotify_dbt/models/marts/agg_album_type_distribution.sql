@@ -0,0 +1,66 @@
+{# DuckDB rejects re-inserting a deleted key under a unique index, so indexes are Postgres only #}
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key='release_year',
+    indexes=[
+        {'columns': ['release_year', 'album_type'], 'unique': True}
+    ] if target.type == 'postgres' else []
+) }}
+
+with releases as (
+    select
+        release_year,
+        coalesce(album_type, 'unknown') as album_type,
+        processed_at
+    from {{ ref('dim_album') }}
+    where release_year is not null
+)
+
+{% if is_incremental() %}
+, stored as (
+    select release_year, sum(release_count) as release_count
+    from {{ this }}
+    group by release_year
+)
+
+, changed as (
+    -- Shares are relative to the whole year, so every type of a touched year is
+    -- recomputed and the year replaced as a whole. A year is touched when one of
+    -- its albums was reprocessed, or when its count drifted from the stored one
+    -- because an album moved to another year.
+    select distinct release_year
+    from releases
+    where processed_at > (select max(last_processed_at) from {{ this }})
+    union
+    select r.release_year
+    from releases r
+    join stored s on r.release_year = s.release_year
+    group by r.release_year, s.release_count
+    having count(*) <> s.release_count
+)
+{% endif %}
+
+, counts as (
+    select
+        r.release_year,
+        r.album_type,
+        count(*) as release_count,
+        max(r.processed_at) as last_processed_at
+    from releases r
+    {% if is_incremental() %}
+    join changed c on r.release_year = c.release_year
+    {% endif %}
+    group by r.release_year, r.album_type
+)
+
+select
+    release_year,
+    album_type,
+    release_count,
+    round(
+        release_count::numeric / sum(release_count) over (partition by release_year),
+        4
+    ) as release_share,
+    last_processed_at
+from counts
@@ -0,0 +1,52 @@
+{# DuckDB rejects re-inserting a deleted key under a unique index, so indexes are Postgres only #}
+{{ config(
+    materialized='incremental',
+    unique_key=['artist_id', 'release_year'],
+    indexes=[
+        {'columns': ['artist_id', 'release_year'], 'unique': True},
+        {'columns': ['release_year']}
+    ] if target.type == 'postgres' else []
+) }}
+
+with releases as (
+    select
+        f.artist_id,
+        f.artist_name,
+        a.album_id,
+        a.release_year,
+        a.total_tracks,
+        a.processed_at
+    from {{ ref('fact_album_artist') }} f
+    join {{ ref('dim_album') }} a on f.album_id = a.album_id
+    where a.release_year is not null
+)
+
+{% if is_incremental() %}
+, changed as (
+    -- Groups of reprocessed albums, plus groups whose count drifted from the
+    -- stored one because an album moved to another year or lost the credit.
+    select distinct artist_id, release_year
+    from releases
+    where processed_at > (select max(last_processed_at) from {{ this }})
+    union
+    select r.artist_id, r.release_year
+    from releases r
+    join {{ this }} t
+        on r.artist_id = t.artist_id and r.release_year = t.release_year
+    group by r.artist_id, r.release_year, t.release_count
+    having count(distinct r.album_id) <> t.release_count
+)
+{% endif %}
+
+select
+    r.artist_id,
+    max(r.artist_name) as artist_name,
+    r.release_year,
+    count(distinct r.album_id) as release_count,
+    sum(r.total_tracks) as total_tracks,
+    max(r.processed_at) as last_processed_at
+from releases r
+{% if is_incremental() %}
+join changed c on r.artist_id = c.artist_id and r.release_year = c.release_year
+{% endif %}
+group by r.artist_id, r.release_year
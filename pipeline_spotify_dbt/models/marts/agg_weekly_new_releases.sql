@@ -0,0 +1,80 @@
+{# DuckDB rejects re-inserting a deleted key under a unique index, so indexes are Postgres only #}
+{{ config(
+    materialized='incremental',
+    unique_key='release_week',
+    indexes=[
+        {'columns': ['release_week'], 'unique': True}
+    ] if target.type == 'postgres' else []
+) }}
+
+with releases as (
+    select
+        date_trunc('week', release_date)::date as release_week,
+        album_id,
+        album_type,
+        total_tracks,
+        processed_at
+    from {{ ref('dim_album') }}
+    where release_date is not null
+),
+
+album_artists as (
+    select album_id, artist_id
+    from {{ ref('fact_album_artist') }}
+)
+
+{% if is_incremental() %}
+, changed as (
+    -- Weeks of reprocessed albums, plus weeks whose count drifted from the
+    -- stored one because an album's release_date moved it to another week.
+    select distinct release_week
+    from releases
+    where processed_at > (select max(last_processed_at) from {{ this }})
+    union
+    select r.release_week
+    from releases r
+    join {{ this }} t on r.release_week = t.release_week
+    group by r.release_week, t.release_count
+    having count(*) <> t.release_count
+)
+{% endif %}
+
+, weekly as (
+    select
+        r.release_week,
+        count(*) as release_count,
+        count(*) filter (where r.album_type = 'album') as album_count,
+        count(*) filter (where r.album_type = 'single') as single_count,
+        count(*) filter (where r.album_type = 'compilation') as compilation_count,
+        sum(r.total_tracks) as total_tracks,
+        max(r.processed_at) as last_processed_at
+    from releases r
+    {% if is_incremental() %}
+    join changed c on r.release_week = c.release_week
+    {% endif %}
+    group by r.release_week
+),
+
+weekly_artists as (
+    select
+        r.release_week,
+        count(distinct aa.artist_id) as artist_count
+    from releases r
+    join album_artists aa on r.album_id = aa.album_id
+    {% if is_incremental() %}
+    join changed c on r.release_week = c.release_week
+    {% endif %}
+    group by r.release_week
+)
+
+select
+    w.release_week,
+    w.release_count,
+    w.album_count,
+    w.single_count,
+    w.compilation_count,
+    coalesce(wa.artist_count, 0) as artist_count,
+    w.total_tracks,
+    w.last_processed_at
+from weekly w
+left join weekly_artists wa on w.release_week = wa.release_week
@@ -0,0 +1,4 @@
+select artist_id, release_year, count(*) as duplicates
+from {{ ref('agg_artist_releases_by_year') }}
+group by artist_id, release_year
+having count(*) > 1
\ No newline at end of file
@@ -1,7 +1,43 @@
 import pytest
 
+from pipeline.storage import DuckDBBackend
+
 
 @pytest.fixture(autouse=True)
 def set_dummy_env(monkeypatch):
     monkeypatch.setenv("CLIENT_ID", "dummy_id")
     monkeypatch.setenv("CLIENT_SECRET", "dummy_secret")
+
+
+@pytest.fixture
+def backend():
+    pytest.importorskip("duckdb")
+    backend = DuckDBBackend(":memory:")
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def make_album():
+    def make(album_id, artist_ids, name="Album"):
+        return {
+            "album_id": album_id,
+            "album_name": name,
+            "album_type": "album",
+            "release_date": "2024-01-01",
+            "release_year": 2024,
+            "release_date_precision": "day",
+            "total_tracks": 10,
+            "image_url": "img_url",
+            "spotify_url": "album_url",
+            "extracted_at": "2025-09-25T10:00:00+00:00",
+            "extraction_type": "new_releases",
+            "processed_at": "2025-09-25T11:00:00+00:00",
+            "data_type": "album",
+            "artists": [
+                {"artist_id": a, "artist_name": f"Artist {a}", "spotify_url": "a_url"}
+                for a in artist_ids
+            ],
+        }
+
+    return make
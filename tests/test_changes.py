@@ -0,0 +1,126 @@
+import copy
+
+from pipeline.changes import (
+    NdjsonChangeLog,
+    TableChangeLog,
+    album_hash,
+    create_change_log,
+    detect_changes,
+)
+from pipeline.load import LoadSpotify
+
+
+def ops(changes):
+    return sorted((c["entity"], c["entity_key"], c["op"]) for c in changes)
+
+
+def test_album_hash_ignores_load_metadata(make_album):
+    album = make_album("1", ["a1", "a2"])
+    reloaded = {**album, "processed_at": "2026-01-01T00:00:00+00:00"}
+    recredited = make_album("1", ["a2", "a3"])
+
+    assert album_hash(reloaded) == album_hash(album)
+    assert album_hash(recredited) != album_hash(album)
+
+
+def test_load_emits_inserts_then_only_updates(backend, make_album):
+    loader = LoadSpotify("duckdb://:memory:", backend=backend, change_log="table")
+    albums = [make_album("1", ["a1"]), make_album("2", ["a1", "a2"])]
+
+    loader.load_albums(albums)
+    first = backend.read_changes()
+    loader.load_albums(copy.deepcopy(albums))
+    albums[1]["album_name"] = "Renamed"
+    loader.load_albums(albums)
+
+    assert ops(first) == [
+        ("album", "1", "insert"),
+        ("album", "2", "insert"),
+        ("artist", "a1", "insert"),
+        ("artist", "a2", "insert"),
+    ]
+    (update,) = backend.read_changes(since=first[-1]["log_offset"])
+    assert (update["entity_key"], update["op"]) == ("2", "update")
+    assert update["before_hash"] != update["after_hash"]
+
+
+def test_unchanged_albums_are_not_rewritten(backend, mocker, make_album):
+    loader = LoadSpotify("duckdb://:memory:", backend=backend, change_log="table")
+    albums = [make_album("1", ["a1"]), make_album("2", ["a2"])]
+    loader.load_albums(albums)
+    upsert = mocker.spy(backend, "upsert_albums")
+
+    albums[1]["artists"][0]["artist_name"] = "New name"
+    loader.load_albums(albums)
+
+    assert [a["album_id"] for a in upsert.call_args.args[0]] == ["2"]
+
+
+def test_rows_loaded_before_tracking_are_updates(backend, make_album):
+    backend.upsert_albums([make_album("1", ["a1"])])
+
+    pending, changes = detect_changes(backend, [make_album("1", ["a1"])])
+
+    assert len(pending) == 1
+    assert {c["op"] for c in changes} == {"update"}
+    assert {c["before_hash"] for c in changes} == {None}
+
+
+def test_ndjson_change_log_reads_by_offset(tmp_path):
+    change_log = NdjsonChangeLog(tmp_path / "changes.ndjson")
+    change = {"entity": "album", "entity_key": "1", "op": "insert"}
+
+    change_log.append([change, {**change, "entity_key": "2"}])
+    change_log.append([{**change, "entity_key": "3"}])
+
+    assert [c["log_offset"] for c in change_log.read()] == [1, 2, 3]
+    assert [c["entity_key"] for c in change_log.read(since=1, limit=1)] == ["2"]
+    assert change_log.read(since=3) == []
+
+
+def test_ndjson_change_log_repairs_a_torn_last_line(tmp_path):
+    path = tmp_path / "changes.ndjson"
+    change = {"entity": "album", "entity_key": "1", "op": "insert"}
+    NdjsonChangeLog(path).append([change, {**change, "entity_key": "2"}])
+    with path.open("ab") as f:
+        f.write(b'{"log_offset": 3, "entity": "al')
+
+    reopened = NdjsonChangeLog(path)
+    assert [c["entity_key"] for c in reopened.read()] == ["1", "2"]
+    reopened.append([{**change, "entity_key": "3"}])
+
+    assert [c["log_offset"] for c in reopened.read()] == [1, 2, 3]
+    assert [c["entity_key"] for c in reopened.read(since=2)] == ["3"]
+
+
+def test_ndjson_change_log_indexes_lines_written_without_an_index(tmp_path):
+    path = tmp_path / "changes.ndjson"
+    change = {"entity": "album", "entity_key": "1", "op": "insert"}
+    NdjsonChangeLog(path).append([change, {**change, "entity_key": "2"}])
+    (tmp_path / "changes.ndjson.idx").unlink()
+
+    change_log = NdjsonChangeLog(path)
+    assert [c["entity_key"] for c in change_log.read(since=1)] == ["2"]
+    change_log.append([{**change, "entity_key": "3"}])
+
+    assert [c["log_offset"] for c in change_log.read()] == [1, 2, 3]
+
+
+def test_create_change_log_from_spec(backend, tmp_path):
+    assert create_change_log("off", backend) is None
+    assert create_change_log(None, backend) is None
+    assert isinstance(create_change_log("table", backend), TableChangeLog)
+    ndjson = create_change_log(str(tmp_path / "c.ndjson"), backend)
+    assert isinstance(ndjson, NdjsonChangeLog)
+
+
+def test_run_metrics_count_only_written_albums(backend, make_album):
+    loader = LoadSpotify("duckdb://:memory:", backend=backend, change_log="table")
+    albums = [make_album("1", ["a1"]), make_album("2", ["a2"])]
+    loader.load_new_releases(albums)
+
+    albums[1]["album_name"] = "Renamed"
+    loader.load_new_releases(albums)
+
+    runs = backend.recent_pipeline_runs(limit=2)
+    assert sorted(r["rows_added"] for r in runs) == [1, 2]
@@ -0,0 +1,115 @@
+import subprocess
+import sys
+
+import pytest
+
+from pipeline import cli
+
+
+def test_cli_import_does_not_load_heavy_dependencies():
+    code = (
+        "import sys, pipeline.cli; "
+        "print(','.join(m for m in ('requests', 'psycopg2', 'dotenv') "
+        "if m in sys.modules))"
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_main_without_command_runs_pipeline(mocker):
+    mock_run = mocker.patch.object(cli, "cmd_run")
+    mocker.patch.object(cli, "configure_logging")
+    mocker.patch.object(
+        cli,
+        "load_env",
+        side_effect=lambda args: setattr(args, "database_url", "duckdb://:memory:"),
+    )
+
+    cli.main([])
+
+    mock_run.assert_called_once()
+    assert mock_run.call_args.args[0].command == "run"
+
+
+@pytest.mark.parametrize(("unfinished", "closed"), [([], True), (["job"], False)])
+def test_serve_closes_pipeline_only_when_jobs_finished(mocker, unfinished, closed):
+    pipeline = mocker.patch("pipeline.pipeline.Pipeline").return_value
+    scheduler = mocker.patch("pipeline.scheduler.Scheduler").return_value
+    scheduler.run_forever.return_value = unfinished
+    args = cli.build_parser().parse_args(["serve", "--new-releases-interval", "1h"])
+
+    cli.cmd_serve(args)
+
+    assert pipeline.close.called is closed
+
+
+def test_missing_database_url_is_a_usage_error(monkeypatch, mocker, capsys):
+    mocker.patch("dotenv.load_dotenv")
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(["status"])
+
+    assert exit_info.value.code == 2
+    assert "set DATABASE_URL or pass --database-url" in capsys.readouterr().err
+
+
+def test_load_env_fills_unset_options(monkeypatch, mocker):
+    mocker.patch("dotenv.load_dotenv")
+    monkeypatch.setenv("DATABASE_URL", "duckdb://:memory:")
+    monkeypatch.setenv("LOAD_WORKERS", "4")
+    args = cli.build_parser().parse_args(["run"])
+
+    cli.load_env(args)
+
+    assert args.database_url == "duckdb://:memory:"
+    assert args.workers == 4
+
+
+def test_command_line_options_override_environment(monkeypatch, mocker):
+    mocker.patch("dotenv.load_dotenv")
+    monkeypatch.setenv("DATABASE_URL", "postgres://env")
+    args = cli.build_parser().parse_args(["status", "--database-url", "duckdb://x"])
+
+    cli.load_env(args)
+
+    assert args.database_url == "duckdb://x"
+
+
+def test_replay_and_status_against_duckdb(tmp_path, capsys, mocker):
+    pytest.importorskip("duckdb")
+    mocker.patch.object(cli, "configure_logging")
+    database_url = f"duckdb://{tmp_path / 'spotify.duckdb'}"
+    raw = tmp_path / "raw.json"
+    raw.write_text(
+        '[{"id": "1", "name": "Album", "release_date": "2024-01-01", '
+        '"artists": [{"id": "a1", "name": "Artist"}]}]'
+    )
+
+    cli.main(["replay", str(raw), "--database-url", database_url])
+    cli.main(["status", "--database-url", database_url])
+
+    out = capsys.readouterr().out
+    assert "load_new_releases" in out
+    assert "success" in out
+
+
+def test_replay_writes_change_log_read_by_changes(tmp_path, capsys, mocker):
+    pytest.importorskip("duckdb")
+    mocker.patch.object(cli, "configure_logging")
+    database_url = f"duckdb://{tmp_path / 'spotify.duckdb'}"
+    change_log = str(tmp_path / "changes.ndjson")
+    raw = tmp_path / "raw.json"
+    raw.write_text('[{"id": "1", "name": "Album", "release_date": "2024-01-01"}]')
+    options = ["--database-url", database_url, "--change-log", change_log]
+
+    cli.main(["replay", str(raw), *options])
+    cli.main(["replay", str(raw), *options])
+    capsys.readouterr()
+    cli.main(["changes", *options])
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    assert '"op": "insert"' in lines[0]
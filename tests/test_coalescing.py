@@ -0,0 +1,137 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.coalescing import MicroBatcher, SingleFlight
+
+
+def test_single_flight_shares_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow_fetch():
+        calls.append(1)
+        release.wait(timeout=1)
+        return {"name": "Artist"}
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(flight.do, "key", slow_fetch) for _ in range(5)]
+        time.sleep(0.05)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert flight.shared == 4
+    assert all(r == {"name": "Artist"} for r in results)
+    assert len({id(r) for r in results}) == 5
+
+
+def test_single_flight_propagates_errors_and_forgets_key():
+    flight = SingleFlight()
+
+    def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        flight.do("key", failing)
+
+    assert flight.do("key", lambda: "ok") == "ok"
+
+
+def test_micro_batcher_merges_calls_within_window():
+    requested = []
+
+    def fetch_many(ids):
+        requested.append(list(ids))
+        return [{"id": i} for i in ids]
+
+    batcher = MicroBatcher(fetch_many, max_size=50, window=0.05)
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = list(executor.map(batcher.submit, [str(i) for i in range(10)]))
+
+    assert results == [{"id": str(i)} for i in range(10)]
+    assert len(requested) == 1
+    assert batcher.submitted == 10
+    assert batcher.batches == 1
+
+
+def test_micro_batcher_splits_at_max_size():
+    requested = []
+
+    def fetch_many(ids):
+        requested.append(len(ids))
+        return [{"id": i} for i in ids]
+
+    batcher = MicroBatcher(fetch_many, max_size=3, window=0.05)
+
+    with ThreadPoolExecutor(max_workers=7) as executor:
+        list(executor.map(batcher.submit, [str(i) for i in range(7)]))
+
+    assert sum(requested) == 7
+    assert max(requested) <= 3
+
+
+def test_micro_batcher_raises_for_missing_items():
+    batcher = MicroBatcher(lambda ids: [None for _ in ids], max_size=5, window=0)
+
+    with pytest.raises(RuntimeError, match="404 missing not found"):
+        batcher.submit("missing")
+
+
+def test_micro_batcher_leader_returns_before_backlog_drains():
+    in_flight = []
+    peak = []
+
+    def fetch_many(ids):
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        time.sleep(0.05)
+        in_flight.pop()
+        return [{"id": i} for i in ids]
+
+    batcher = MicroBatcher(fetch_many, max_size=2, window=0.01)
+
+    def timed(item_id):
+        started = time.perf_counter()
+        batcher.submit(item_id)
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=21) as executor:
+        leader = executor.submit(timed, "leader")
+        time.sleep(0.005)
+        others = list(executor.map(timed, [str(i) for i in range(20)]))
+
+    # Eleven batches one after another would take well over half a second.
+    assert leader.result() < 0.25
+    assert max(others) < 0.5
+    assert max(peak) > 1
+
+
+def test_micro_batcher_isolates_an_id_that_fails_the_batch():
+    requested = []
+
+    def fetch_many(ids):
+        requested.append(list(ids))
+        if "bad" in ids:
+            raise RuntimeError("Failed to make request: 400 invalid id")
+        return [{"id": i} for i in ids]
+
+    batcher = MicroBatcher(fetch_many, max_size=10, window=0.05)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = {
+            i: executor.submit(batcher.submit, i) for i in ["1", "2", "bad", "3"]
+        }
+
+    assert [futures[i].result() for i in ["1", "2", "3"]] == [
+        {"id": "1"},
+        {"id": "2"},
+        {"id": "3"},
+    ]
+    with pytest.raises(RuntimeError, match="400 invalid id"):
+        futures["bad"].result()
+    assert len(requested[0]) == 4
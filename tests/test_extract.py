@@ -44,3 +44,22 @@ def test_extract_new_releases_raises_on_error(mocker):
 
     with pytest.raises(Exception, match="Failed to extract new releases."):
         extractor.extract_new_releases(limit=1)
+
+
+def test_extract_new_releases_skips_seen_albums(mocker):
+    from pipeline.seen import SeenIds
+
+    mock_client = mocker.patch("pipeline.extract.SpotifyAPI")
+    mock_instance = mock_client.return_value
+    first, second = "0" * 21 + "1", "0" * 21 + "2"
+    mock_instance.get_new_releases.return_value = {
+        "albums": {"items": [{"id": first}, {"id": second}, {"name": "no id"}]}
+    }
+    seen_ids = SeenIds()
+    seen_ids.add(first)
+
+    extractor = ExtractSpotify(seen_ids=seen_ids)
+    result = extractor.extract_new_releases(limit=3)
+
+    assert [album.get("id") for album in result] == [second, None]
+    assert second in seen_ids
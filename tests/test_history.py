@@ -0,0 +1,119 @@
+from datetime import UTC, date, datetime
+
+import pytest
+
+from pipeline.history import (
+    bucket_of,
+    bucket_upper_bound,
+    percentile,
+    rebuild_rollups,
+    summary,
+    update_rollup,
+)
+from pipeline.metrics import log_pipeline_run
+
+STAGES = {"extract": 2.0, "transform": 0.1, "load": 0.5}
+
+
+def record(backend, day, status="success", rows_added=10, stage_seconds=None):
+    run = backend.record_pipeline_run(
+        run_at=datetime(2025, 3, day, 12, tzinfo=UTC),
+        operation="load_new_releases",
+        status=status,
+        rows_added=rows_added,
+        stage_seconds=stage_seconds or STAGES,
+    )
+    update_rollup(backend, run)
+
+
+def test_percentile_is_within_one_bucket():
+    histogram = {str(bucket_of(s)): 1 for s in (0.2, 0.4, 1.0, 3.0, 9.0)}
+
+    p50 = percentile(histogram, 0.5)
+
+    assert 1.0 <= p50 < 1.1
+    assert percentile(histogram, 0.95) == bucket_upper_bound(bucket_of(9.0))
+    assert percentile({}, 0.5) is None
+
+
+def test_log_pipeline_run_updates_daily_rollup(backend):
+    log_pipeline_run(backend, "load_new_releases", "success", 5, STAGES)
+    log_pipeline_run(backend, "load_new_releases", "failure", 5, STAGES)
+
+    rollup = backend.latest_rollup("load_new_releases")
+    assert rollup["runs"] == 2
+    assert rollup["failures"] == 1
+    assert rollup["rows_added"] == 5
+    assert rollup["failure_streak"] == 1
+    assert rollup["duration_seconds"] == pytest.approx(5.2)
+    assert rollup["success_duration_seconds"] == pytest.approx(2.6)
+
+
+def test_failure_streak_carries_across_days(backend):
+    record(backend, 1, status="success")
+    record(backend, 1, status="failure")
+    record(backend, 2, status="failure")
+    record(backend, 2, status="failure")
+
+    day_two = backend.get_rollup(date(2025, 3, 2), "load_new_releases")
+
+    assert day_two["failure_streak"] == 3
+    assert day_two["longest_failure_streak"] == 3
+
+
+def test_throughput_leaves_out_failed_runs(backend):
+    record(backend, 3, rows_added=26)
+    record(backend, 3, status="failure")
+
+    (day,) = summary(backend, days=1, today=date(2025, 3, 3))["daily"]
+
+    assert day["rows_per_second"] == pytest.approx(10.0)
+
+
+def test_summary_compares_with_previous_window(backend):
+    record(backend, 2, stage_seconds={"extract": 1.0, "load": 0.5})
+    record(backend, 4, stage_seconds={"extract": 2.0, "load": 0.5})
+    record(backend, 5, stage_seconds={"extract": 2.0, "load": 0.5})
+
+    report = summary(backend, days=2, today=date(2025, 3, 5))
+
+    assert [day["day"] for day in report["daily"]] == [
+        date(2025, 3, 4),
+        date(2025, 3, 5),
+    ]
+    assert report["runs"] == 2
+    extract = report["stages"]["extract"]
+    assert extract["p95"] == pytest.approx(2.0, rel=0.1)
+    assert extract["previous_p95"] == pytest.approx(1.0, rel=0.1)
+    assert extract["p95_change"] == pytest.approx(1.0, rel=0.25)
+    assert report["stages"]["load"]["p95_change"] == pytest.approx(0.0)
+
+
+def test_summary_reports_entity_growth(backend):
+    record(backend, 1)
+    backend.conn.execute(
+        "INSERT INTO album (album_id, album_name) VALUES ('1', 'A'), ('2', 'B')"
+    )
+    record(backend, 3)
+
+    growth = summary(backend, days=2, today=date(2025, 3, 3))["growth"]
+
+    assert growth["albums"] == {"total": 2, "change": 2, "per_day": 1.0}
+    assert growth["artists"]["change"] == 0
+
+
+def test_rebuild_matches_incremental_rollups(backend):
+    for day, status in [(1, "failure"), (1, "success"), (2, "failure"), (3, "failure")]:
+        record(backend, day, status=status)
+    incremental = backend.rollups_since("load_new_releases", date(2025, 3, 1))
+
+    assert rebuild_rollups(backend) == 3
+    assert backend.rollups_since("load_new_releases", date(2025, 3, 1)) == incremental
+
+
+def test_rollup_failure_does_not_fail_the_run(backend, mocker):
+    mocker.patch("pipeline.metrics.update_rollup", side_effect=RuntimeError("boom"))
+
+    log_pipeline_run(backend, "load_new_releases", "success", 1)
+
+    assert len(backend.recent_pipeline_runs()) == 1
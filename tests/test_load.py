@@ -30,7 +30,7 @@ def sample_clean_album():
 def test_load_album_executes_queries(sample_clean_album):
     loader = LoadSpotify(database_url="postgres://test")
 
-    with patch("pipeline.load.psycopg2.connect") as mock_connect:
+    with patch("psycopg2.connect") as mock_connect:
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_connect.return_value.__enter__.return_value = mock_conn
@@ -47,10 +47,23 @@ def test_load_album_executes_queries(sample_clean_album):
         assert any("1" in p for p in params)
 
 
-def test_load_new_releases_calls_load_album(mocker, sample_clean_album):
+def test_load_new_releases_loads_one_batch(mocker, sample_clean_album):
     loader = LoadSpotify(database_url="postgres://test")
-    mock_load_album = mocker.patch.object(loader, "load_album")
+    mock_load_albums = mocker.patch.object(loader, "load_albums")
     mocker.patch("pipeline.load.log_pipeline_run")
 
     loader.load_new_releases([sample_clean_album, sample_clean_album])
-    assert mock_load_album.call_count == 2
+    mock_load_albums.assert_called_once_with(
+        clean_albums=[sample_clean_album, sample_clean_album]
+    )
+
+
+def test_load_new_releases_logs_failure(mocker, sample_clean_album):
+    loader = LoadSpotify(database_url="postgres://test")
+    mocker.patch.object(loader, "load_albums", side_effect=RuntimeError("DB down"))
+    mock_log = mocker.patch("pipeline.load.log_pipeline_run")
+
+    with pytest.raises(RuntimeError, match="DB down"):
+        loader.load_new_releases([sample_clean_album])
+
+    assert mock_log.call_args.kwargs["status"] == "failure"
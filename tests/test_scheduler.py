@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from pipeline.scheduler import Job, Scheduler, parse_interval
+
+
+@pytest.mark.parametrize(
+    ("spec", "seconds"),
+    [("90s", 90), ("15m", 900), ("1h", 3600), ("2d", 172800), ("@hourly", 3600)],
+)
+def test_parse_interval(spec, seconds):
+    assert parse_interval(spec) == seconds
+
+
+@pytest.mark.parametrize("spec", ["", "1w", "0m", "hourly"])
+def test_parse_interval_rejects_invalid(spec):
+    with pytest.raises(ValueError, match="Invalid interval"):
+        parse_interval(spec)
+
+
+def run_in_background(scheduler):
+    thread = threading.Thread(target=scheduler.run_forever)
+    thread.start()
+    return thread
+
+
+def test_scheduler_runs_jobs_repeatedly_until_stopped():
+    runs = []
+    scheduler = Scheduler([Job("tick", interval=0.02, func=lambda: runs.append(1))])
+
+    thread = run_in_background(scheduler)
+    time.sleep(0.15)
+    scheduler.stop()
+    thread.join(timeout=1)
+
+    assert not thread.is_alive()
+    assert len(runs) >= 3
+
+
+def test_scheduler_skips_overlapping_runs():
+    release = threading.Event()
+    started = []
+
+    def slow_job():
+        started.append(1)
+        release.wait(timeout=1)
+
+    scheduler = Scheduler([Job("slow", interval=0.01, func=slow_job)])
+
+    thread = run_in_background(scheduler)
+    time.sleep(0.1)
+    release.set()
+    scheduler.stop()
+    thread.join(timeout=1)
+
+    assert len(started) == 1
+
+
+def test_scheduler_waits_for_running_job_on_shutdown():
+    finished = threading.Event()
+
+    def job():
+        time.sleep(0.1)
+        finished.set()
+
+    scheduler = Scheduler([Job("job", interval=60, func=job)])
+
+    thread = run_in_background(scheduler)
+    time.sleep(0.02)
+    scheduler.stop()
+    thread.join(timeout=1)
+
+    assert finished.is_set()
+
+
+def test_scheduler_reports_jobs_still_running_after_timeout():
+    release = threading.Event()
+    scheduler = Scheduler(
+        [Job("stuck", interval=60, func=lambda: release.wait(timeout=1))],
+        shutdown_timeout=0.01,
+    )
+    unfinished = []
+
+    thread = threading.Thread(target=lambda: unfinished.extend(scheduler.run_forever()))
+    thread.start()
+    time.sleep(0.02)
+    scheduler.stop()
+    thread.join(timeout=1)
+    release.set()
+
+    assert unfinished == ["stuck"]
+
+
+def test_scheduler_keeps_running_after_job_failure():
+    runs = []
+
+    def flaky():
+        runs.append(1)
+        raise RuntimeError("boom")
+
+    scheduler = Scheduler([Job("flaky", interval=0.02, func=flaky)])
+
+    thread = run_in_background(scheduler)
+    time.sleep(0.1)
+    scheduler.stop()
+    thread.join(timeout=1)
+
+    assert len(runs) >= 2
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from pipeline.seen import ALPHABET, SeenIds, decode_id, decode_ids
+
+
+def encode(value):
+    chars = []
+    for _ in range(22):
+        value, digit = divmod(value, 62)
+        chars.append(chr(ALPHABET[digit]))
+    return "".join(reversed(chars))
+
+
+@pytest.fixture
+def ids():
+    rng = np.random.default_rng(0)
+    # a few small values share their high word, as in hand-made test IDs
+    values = [int.from_bytes(rng.bytes(16)) for _ in range(2_000)] + list(range(50))
+    return [encode(v) for v in values]
+
+
+def test_decode_matches_python_integers(ids):
+    keys = decode_ids(ids)
+
+    decoded = [int(high) << 64 | int(low) for low, high in keys.T]
+
+    assert decoded == [decode_id(i) for i in ids]
+    assert decode_id("0" * 21 + "z") == 35
+
+
+@pytest.mark.parametrize("bad", ["short", "0" * 23, "!" * 22, "Z" * 22])
+def test_decode_rejects_invalid_ids(bad):
+    with pytest.raises(ValueError, match="Invalid Spotify ID"):
+        decode_ids([bad])
+    with pytest.raises(ValueError, match="Invalid Spotify ID"):
+        decode_id(bad)
+
+
+def test_add_many_reports_first_occurrences(ids):
+    seen = SeenIds()
+
+    first = seen.add_many(ids[:1_000] + ids[:10])
+    second = seen.add_many(ids[500:1_500])
+
+    assert first.sum() == 1_000
+    assert not first[1_000:].any()
+    assert list(np.flatnonzero(second)) == list(range(500, 1_000))
+    assert len(seen) == 1_500
+
+
+def test_single_adds_and_lookups_see_every_block(ids):
+    seen = SeenIds(buffer_size=64)
+
+    added = [seen.add(i) for i in ids[:1_000]]
+    seen.add_many(ids[1_000:])
+
+    assert all(added)
+    assert not any(seen.add(i) for i in ids[::7])
+    assert all(i in seen for i in ids)
+    assert seen.contains_many(ids).all()
+    assert encode(2**100) not in seen
+    assert len(seen) == len(ids)
+
+
+def test_blocks_spill_to_disk_over_budget(ids, tmp_path):
+    seen = SeenIds(memory_budget=4_096, buffer_size=64, spill_dir=tmp_path)
+
+    for start in range(0, len(ids), 300):
+        seen.add_many(ids[start : start + 300])
+
+    assert seen.resident_bytes <= 4_096
+    assert seen.spilled_bytes >= 16 * len(ids) - 4_096
+    assert seen.contains_many(ids).all()
+    # merged-away blocks do not leave files behind
+    spilled = [b for b in seen._blocks if isinstance(b, np.memmap)]
+    assert len(list(tmp_path.iterdir())) == len(spilled)
+
+
+def test_merge_counts_its_resident_inputs_against_the_budget(ids, tmp_path):
+    # Two 200-ID blocks merge into 6,400 bytes, which fits the budget alone
+    # but not together with the inputs still held during the merge.
+    seen = SeenIds(memory_budget=8_000, spill_dir=tmp_path)
+
+    seen.add_many(ids[:200])
+    seen.add_many(ids[200:400])
+
+    (merged,) = seen._blocks
+    assert isinstance(merged, np.memmap)
+    assert seen.contains_many(ids[:400]).all()
+
+
+def test_merge_in_chunks_keeps_blocks_sorted(ids, monkeypatch):
+    monkeypatch.setattr("pipeline.seen.MERGE_CHUNK", 7)
+    seen = SeenIds()
+
+    for start in range(0, len(ids), 250):
+        seen.add_many(ids[start : start + 250])
+
+    for block in seen._blocks:
+        assert (block[0][1:] >= block[0][:-1]).all()
+    assert seen.contains_many(ids).all()
+    assert len(seen) == len(ids)
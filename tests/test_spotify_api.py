@@ -1,10 +1,13 @@
 import base64
+import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import pytest
 
 from api.spotify_api import SpotifyAPI
+from pipeline.transform import TransformSpotify
 
 
 def test_init_raises_when_missing_env(monkeypatch: Any) -> None:
@@ -36,7 +39,7 @@ def test_get_token_success(mocker: Any) -> None:
         "expires_in": 3600,
     }
 
-    mocker.patch("requests.post", return_value=fake_response)
+    mocker.patch("requests.Session.post", return_value=fake_response)
 
     token = client.get_token()
 
@@ -52,7 +55,7 @@ def test_get_token_failure(mocker: Any) -> None:
     fake_response.status_code = 400
     fake_response.text = "dummy_text"
 
-    mocker.patch("requests.post", return_value=fake_response)
+    mocker.patch("requests.Session.post", return_value=fake_response)
 
     with pytest.raises(
         RuntimeError, match=re.escape("Failed to get token: 400 dummy_text")
@@ -88,7 +91,7 @@ def test_make_request_json_response(mocker: Any) -> None:
     fake_response.status_code = 200
     fake_response.json.return_value = {"name": "Taylor Swift"}
 
-    mocker.patch("requests.get", return_value=fake_response)
+    mocker.patch("requests.Session.get", return_value=fake_response)
 
     result = client.make_request("/tracks/123")
 
@@ -106,7 +109,7 @@ def test_make_request_failed(mocker: Any) -> None:
     fake_response.status_code = 400
     fake_response.text = "dummy_text"
 
-    mocker.patch("requests.get", return_value=fake_response)
+    mocker.patch("requests.Session.get", return_value=fake_response)
 
     with pytest.raises(
         RuntimeError, match=re.escape("Failed to make request: 400 dummy_text")
@@ -130,3 +133,135 @@ def test_search(mocker: Any) -> None:
     )
 
     assert result == fake_result
+
+
+NEW_RELEASES_BODY: dict[str, Any] = {
+    "albums": {
+        "href": "https://api.spotify.com/v1/browse/new-releases",
+        "items": [
+            {
+                "id": "1",
+                "name": "Album",
+                "album_type": "single",
+                "available_markets": ["PL", "US"],
+                "href": "https://api.spotify.com/v1/albums/1",
+                "artists": [
+                    {
+                        "id": "a1",
+                        "name": "Artist",
+                        "href": "https://api.spotify.com/v1/artists/a1",
+                        "external_urls": {"spotify": "artist_url"},
+                    }
+                ],
+                "images": [{"url": "img", "width": 640, "height": 640}],
+                "total_tracks": 1,
+                "release_date": "2025-01-01",
+                "release_date_precision": "day",
+                "external_urls": {"spotify": "album_url"},
+            }
+        ],
+    }
+}
+
+
+def test_make_request_fast_decode_keeps_only_used_fields(mocker: Any) -> None:
+    pytest.importorskip("msgspec")
+    client = SpotifyAPI(fast_decode=True)
+    mocker.patch.object(client, "get_headers", return_value={})
+
+    fake_response = mocker.Mock()
+    fake_response.status_code = 200
+    fake_response.content = json.dumps(NEW_RELEASES_BODY).encode()
+    mocker.patch("requests.Session.get", return_value=fake_response)
+
+    result = client.get_new_releases(limit=1)
+
+    album = result["albums"]["items"][0]
+    assert "available_markets" not in album
+    assert "href" not in album
+    assert album["artists"][0] == {
+        "id": "a1",
+        "name": "Artist",
+        "external_urls": {"spotify": "artist_url"},
+    }
+    fake_response.json.assert_not_called()
+
+
+def test_fast_decode_cleans_album_like_full_json(mocker: Any) -> None:
+    pytest.importorskip("msgspec")
+    from api import decoders
+
+    content = json.dumps(NEW_RELEASES_BODY).encode()
+    fast = decoders.decode(content, "new_releases")["albums"]["items"][0]
+    full = NEW_RELEASES_BODY["albums"]["items"][0]
+
+    mocker.patch("pipeline.transform.datetime")
+    transformer = TransformSpotify()
+    assert transformer.clean_album(fast) == transformer.clean_album(full)
+
+
+def test_make_request_fast_decode_falls_back_on_schema_mismatch(
+    mocker: Any,
+) -> None:
+    pytest.importorskip("msgspec")
+    client = SpotifyAPI(fast_decode=True)
+    mocker.patch.object(client, "get_headers", return_value={})
+
+    fake_response = mocker.Mock()
+    fake_response.status_code = 200
+    fake_response.content = b'{"albums": {"items": "unexpected"}}'
+    fake_response.json.return_value = {"albums": {"items": "unexpected"}}
+    mocker.patch("requests.Session.get", return_value=fake_response)
+
+    result = client.get_new_releases(limit=1)
+
+    assert result == {"albums": {"items": "unexpected"}}
+
+
+def test_get_artist_is_micro_batched(mocker: Any) -> None:
+    client = SpotifyAPI(batch_window=0.05)
+    mock_several = mocker.patch.object(
+        client,
+        "get_several_artists",
+        side_effect=lambda ids: {"artists": [{"id": i} for i in ids]},
+    )
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(client.get_artist, ["a1", "a2", "a3", "a1"]))
+
+    assert [r["id"] for r in results] == ["a1", "a2", "a3", "a1"]
+    mock_several.assert_called_once()
+    assert sorted(mock_several.call_args.args[0]) == ["a1", "a2", "a3"]
+
+
+def test_request_stats_counts_http_requests(mocker: Any) -> None:
+    client = SpotifyAPI()
+    mocker.patch.object(client, "get_headers", return_value={})
+
+    fake_response = mocker.Mock()
+    fake_response.status_code = 200
+    fake_response.json.return_value = {}
+    mocker.patch("requests.Session.get", return_value=fake_response)
+
+    client.get_artist("a1")
+    client.get_artist("a1")
+
+    stats = client.request_stats()
+    assert stats["http_requests"] == 2
+    assert stats["reduction"] == 0.0
+
+
+def test_make_request_refreshes_expiring_token(mocker: Any) -> None:
+    client = SpotifyAPI()
+    client.access_token = "old"  # noqa: S105
+    client.token_expires_at = 0.0
+    mock_get_token = mocker.patch.object(client, "get_token")
+
+    fake_response = mocker.Mock()
+    fake_response.status_code = 200
+    fake_response.json.return_value = {}
+    mocker.patch("requests.Session.get", return_value=fake_response)
+
+    client.make_request("/tracks/123")
+
+    mock_get_token.assert_called_once()
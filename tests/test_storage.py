@@ -0,0 +1,189 @@
+import threading
+from datetime import UTC, datetime
+
+import pytest
+from psycopg2 import OperationalError
+
+from pipeline.history import ENTITIES, update_rollup
+from pipeline.load import LoadSpotify
+from pipeline.metrics import log_pipeline_run
+from pipeline.storage import (
+    ALBUM_ARTIST_INSERT_VALUES_SQL,
+    ARTIST_UPSERT_VALUES_SQL,
+    STAGES,
+    DuckDBBackend,
+    PostgresBackend,
+    ShardedPostgresBackend,
+    create_backend,
+)
+
+
+def count(backend, table):
+    return backend.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]  # noqa: S608
+
+
+def test_create_backend_picks_by_scheme():
+    pytest.importorskip("duckdb")
+    assert isinstance(create_backend("postgres://test"), PostgresBackend)
+    assert isinstance(
+        create_backend("postgres://test", workers=4), ShardedPostgresBackend
+    )
+    duck = create_backend("duckdb://:memory:")
+    assert isinstance(duck, DuckDBBackend)
+    duck.close()
+
+
+def test_duckdb_upsert_inserts_albums_artists_and_links(backend, make_album):
+    backend.upsert_albums([make_album("1", ["a1", "a2"]), make_album("2", ["a1"])])
+
+    assert count(backend, "album") == 2
+    assert count(backend, "artist") == 2
+    assert count(backend, "album_artist") == 3
+
+
+def test_duckdb_upsert_updates_existing_rows(backend, make_album):
+    backend.upsert_albums([make_album("1", ["a1"], name="Old")])
+    backend.upsert_albums([make_album("1", ["a1"], name="New")])
+
+    name = backend.conn.execute(
+        "SELECT album_name FROM album WHERE album_id = '1'"
+    ).fetchone()[0]
+    assert name == "New"
+    assert count(backend, "album") == 1
+    assert count(backend, "album_artist") == 1
+
+
+def test_duckdb_upsert_collapses_duplicates_within_batch(backend, make_album):
+    backend.upsert_albums(
+        [make_album("1", ["a1"], name="First"), make_album("1", ["a1"], name="Last")]
+    )
+
+    name = backend.conn.execute("SELECT album_name FROM album").fetchone()[0]
+    assert name == "Last"
+
+
+def test_log_pipeline_run_records_totals(backend, make_album):
+    backend.upsert_albums([make_album("1", ["a1", "a2"])])
+
+    log_pipeline_run(backend, operation="load_new_releases", status="success")
+
+    row = backend.conn.execute(
+        "SELECT operation, status, total_albums, total_artists, total_album_artist "
+        "FROM pipeline_metrics"
+    ).fetchone()
+    assert row == ("load_new_releases", "success", 1, 2, 2)
+
+
+def test_loader_runs_against_duckdb(backend, make_album):
+    loader = LoadSpotify(database_url="duckdb://:memory:", backend=backend)
+
+    loader.load_new_releases([make_album("1", ["a1"]), make_album("2", ["a2"])])
+
+    assert count(backend, "album") == 2
+    assert count(backend, "pipeline_metrics") == 1
+
+
+def test_postgres_backend_replaces_dropped_pooled_connection(mocker):
+    dead = mocker.MagicMock(closed=0)
+    dead.cursor.return_value.__enter__.return_value.execute.side_effect = (
+        OperationalError("server closed the connection unexpectedly")
+    )
+    alive = mocker.MagicMock(closed=0)
+    pool = mocker.patch("pipeline.storage.ThreadedConnectionPool").return_value
+    pool.getconn.side_effect = [dead, alive]
+    backend = PostgresBackend("postgres://test")
+
+    with backend._transaction() as cursor:
+        cursor.execute("SELECT 2;")
+
+    pool.putconn.assert_any_call(dead, close=True)
+    pool.putconn.assert_called_with(alive, close=False)
+    cursor.execute.assert_called_with("SELECT 2;")
+    assert cursor is alive.__enter__.return_value.cursor.return_value.__enter__()
+
+
+def test_postgres_rollup_update_is_one_locked_transaction(mocker):
+    pool = mocker.patch("pipeline.storage.ThreadedConnectionPool").return_value
+    conn = pool.getconn.return_value
+    conn.closed = 0
+    cursor = conn.__enter__.return_value.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = []
+    backend = PostgresBackend("postgres://test")
+    run = {
+        "run_at": datetime(2025, 3, 1, 12, tzinfo=UTC),
+        "operation": "load_new_releases",
+        "status": "success",
+        "rows_added": 1,
+        "duration_seconds": 1.0,
+        **{f"{stage}_seconds": None for stage in STAGES},
+        **{f"total_{entity}": None for entity in ENTITIES},
+    }
+
+    update_rollup(backend, run)
+
+    assert pool.getconn.call_count == 1
+    statements = [c.args[0] for c in cursor.execute.call_args_list]
+    assert statements[0] == "SELECT pg_advisory_xact_lock(hashtext(%s));"
+    assert "pipeline_metrics_daily" in statements[-1]
+    assert "INSERT" in statements[-1]
+    assert backend._local.cursor is None
+
+
+@pytest.fixture
+def recorded_statements(mocker):
+    statements = []
+    lock = threading.Lock()
+
+    def fake_execute_values(_cursor, query, rows, **_kwargs):
+        with lock:
+            statements.append((query, list(rows)))
+
+    mocker.patch("pipeline.storage.ThreadedConnectionPool")
+    mocker.patch("pipeline.storage.execute_values", side_effect=fake_execute_values)
+    return statements
+
+
+def test_sharded_backend_assigns_each_album_to_one_shard(make_album):
+    backend = ShardedPostgresBackend("postgres://test", workers=3)
+    albums = [make_album(str(i), ["a1"]) for i in range(30)]
+
+    shards = backend.shard_batch(albums)
+
+    loaded = sorted(row[0] for shard in shards for row in shard[0])
+    assert loaded == sorted(str(i) for i in range(30))
+    assert backend.shard_batch(albums) == shards
+
+
+def test_sharded_backend_writes_links_after_parents(recorded_statements, make_album):
+    backend = ShardedPostgresBackend("postgres://test", workers=4)
+    albums = [make_album(str(i), ["a3", "a1", "a2"]) for i in range(20)]
+
+    backend.upsert_albums(albums)
+
+    queries = [query for query, _ in recorded_statements]
+    first_link = queries.index(ALBUM_ARTIST_INSERT_VALUES_SQL)
+    assert ALBUM_ARTIST_INSERT_VALUES_SQL not in queries[:first_link]
+    assert all(q == ALBUM_ARTIST_INSERT_VALUES_SQL for q in queries[first_link:])
+    links = [
+        row
+        for query, rows in recorded_statements
+        if query == ALBUM_ARTIST_INSERT_VALUES_SQL
+        for row in rows
+    ]
+    assert len(links) == 60
+
+
+def test_sharded_backend_upserts_artists_in_id_order(recorded_statements, make_album):
+    backend = ShardedPostgresBackend("postgres://test", workers=2)
+
+    backend.upsert_albums([make_album(str(i), ["c", "a", "b"]) for i in range(10)])
+
+    for query, rows in recorded_statements:
+        if query == ARTIST_UPSERT_VALUES_SQL:
+            ids = [row[0] for row in rows]
+            assert ids == sorted(ids)
+
+
+def test_sharded_backend_rejects_zero_workers():
+    with pytest.raises(ValueError, match="workers must be at least 1."):
+        ShardedPostgresBackend("postgres://test", workers=0)